@@ -0,0 +1,87 @@
+"""Bounded pool of agent instances with idle expiry."""
+
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+import time
+from app.agents.base_agent import BaseAgent
+from app.utils.logger import logger
+
+
+class AgentPool:
+    """LRU pool of agents that drops entries idle for longer than a TTL."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0):
+        """
+        Initialize agent pool.
+
+        Args:
+            maxsize: Maximum number of agents kept
+            ttl: Seconds an agent may sit idle before it is evicted
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (agent, expiry on the monotonic clock), least recently used first
+        self._agents: "OrderedDict[str, Tuple[BaseAgent, float]]" = OrderedDict()
+
+    def get_or_create(self, key: str, factory: Callable[[], BaseAgent]) -> BaseAgent:
+        """
+        Get a pooled agent, creating it on a miss or after expiry.
+
+        Args:
+            key: Pool key
+            factory: Callable that builds a new agent
+
+        Returns:
+            Agent instance
+        """
+        now = time.monotonic()
+        entry = self._agents.pop(key, None)
+        agent = entry[0] if entry is not None and entry[1] > now else factory()
+        self._agents[key] = (agent, now + self.ttl)
+
+        while len(self._agents) > self.maxsize:
+            evicted, _ = self._agents.popitem(last=False)
+            logger.debug(f"Evicted agent {evicted} from pool")
+        return agent
+
+    def get(self, key: str) -> Optional[BaseAgent]:
+        """
+        Get a pooled agent without creating or refreshing it.
+
+        Args:
+            key: Pool key
+
+        Returns:
+            Agent instance or None
+        """
+        entry = self._agents.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    def expire_in(self, key: str, ttl: float) -> None:
+        """
+        Shorten an agent's remaining lifetime (e.g. after its client disconnects).
+
+        Args:
+            key: Pool key
+            ttl: Seconds until the agent expires
+        """
+        entry = self._agents.get(key)
+        if entry is not None:
+            self._agents[key] = (entry[0], min(entry[1], time.monotonic() + ttl))
+
+    def items(self) -> List[Tuple[str, BaseAgent]]:
+        """
+        List live agents, dropping expired ones.
+
+        Returns:
+            List of (key, agent) pairs
+        """
+        now = time.monotonic()
+        for key in [key for key, (_, expiry) in self._agents.items() if expiry <= now]:
+            del self._agents[key]
+        return [(key, agent) for key, (agent, _) in self._agents.items()]
+
+    def __len__(self) -> int:
+        return len(self._agents)
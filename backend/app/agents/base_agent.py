@@ -1,6 +1,8 @@
 """Base agent class with conversation management and memory."""
 
 from abc import ABC, abstractmethod
+from collections import deque
+import time
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 from app.utils.logger import logger
@@ -29,9 +31,25 @@ class Message:
         self.id = message_id or generate_message_id()
         self.role = role
         self.content = content
-        self.timestamp = datetime.now()
+        # Raw clock reading; the datetime and ISO string are built on demand
+        self._ts_ns = time.time_ns()
+        self._timestamp_iso: Optional[str] = None
         self.metadata = metadata or {}
         self.token_count = calculate_token_estimate(content)
+        # Shared LLM-format dict; callers must treat it as read-only
+        self._llm_dict = {"role": role, "content": content}
+
+    @property
+    def timestamp(self) -> datetime:
+        """Creation time as a local datetime."""
+        return datetime.fromtimestamp(self._ts_ns / 1e9)
+
+    @property
+    def timestamp_iso(self) -> str:
+        """Creation time as an ISO 8601 string (cached)."""
+        if self._timestamp_iso is None:
+            self._timestamp_iso = self.timestamp.isoformat()
+        return self._timestamp_iso
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert message to dictionary."""
@@ -39,7 +57,7 @@ class Message:
             "id": self.id,
             "role": self.role,
             "content": self.content,
-            "timestamp": self.timestamp.isoformat(),
+            "timestamp": self.timestamp_iso,
             "metadata": self.metadata,
             "token_count": self.token_count
         }
@@ -68,18 +86,34 @@ class BaseAgent(ABC):
         self.system_prompt = system_prompt or "You are a helpful AI assistant."
         self.max_history = max_history
         self.max_tokens = max_tokens
-        self.conversation_history: List[Message] = []
+        # System messages are kept separately so the bounded deque only
+        # evicts user/assistant turns
+        self._system_msgs: List[Message] = []
+        self._recent: deque = deque(maxlen=max_history)
+        # Running token total of the retained history and the last built context
+        self._token_sum = 0
+        self._last_ctx_key: Optional[tuple] = None
+        self._last_ctx: List[Dict[str, Any]] = []
+        # Whether the last built context still starts with a system message
+        self._context_has_system = False
         self.total_tokens_used = 0
         self.total_cost = 0.0
         self.created_at = datetime.now()
+        self._created_at_iso = self.created_at.isoformat()
 
         # Add system message if provided
         if self.system_prompt:
             system_msg = Message("system", self.system_prompt)
-            self.conversation_history.append(system_msg)
+            self._system_msgs.append(system_msg)
+            self._token_sum += system_msg.token_count
 
         logger.info(f"Initialized agent: {self.agent_id}")
 
+    @property
+    def conversation_history(self) -> List[Message]:
+        """Full conversation history (system messages first, then recent turns)."""
+        return self._system_msgs + list(self._recent)
+
     def add_message(self, role: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> Message:
         """
         Add a message to the conversation history.
@@ -93,16 +127,16 @@ class BaseAgent(ABC):
             Created message object
         """
         message = Message(role, content, metadata=metadata)
-        self.conversation_history.append(message)
-
-        # Trim history if too long
-        if len(self.conversation_history) > self.max_history:
-            # Keep system message and recent messages
-            system_msgs = [msg for msg in self.conversation_history if msg.role == "system"]
-            other_msgs = [msg for msg in self.conversation_history if msg.role != "system"]
-            self.conversation_history = system_msgs + other_msgs[-self.max_history + len(system_msgs):]
+        if role == "system":
+            self._system_msgs.append(message)
+        else:
+            # deque(maxlen=...) drops the oldest turn automatically
+            if len(self._recent) == self._recent.maxlen:
+                self._token_sum -= self._recent[0].token_count
+            self._recent.append(message)
+        self._token_sum += message.token_count
 
-        logger.debug(f"Added {role} message to agent {self.agent_id}")
+        logger.debug("Added %s message to agent %s", role, self.agent_id)
         return message
 
     def get_conversation_context(self, max_tokens: Optional[int] = None) -> List[Dict[str, Any]]:
@@ -116,17 +150,31 @@ class BaseAgent(ABC):
             List of message dictionaries
         """
         max_tokens = max_tokens or self.max_tokens
-        context = []
-        current_tokens = 0
-
-        # Start from most recent messages and work backwards
-        for message in reversed(self.conversation_history):
-            if current_tokens + message.token_count > max_tokens:
-                break
-            context.insert(0, {"role": message.role, "content": message.content})
-            current_tokens += message.token_count
-
-        return context
+        last_msg = self._recent[-1] if self._recent else None
+        cache_key = (
+            len(self._system_msgs),
+            len(self._recent),
+            max_tokens,
+            last_msg.id if last_msg else None
+        )
+        if cache_key == self._last_ctx_key:
+            return list(self._last_ctx)
+
+        history = self._system_msgs + list(self._recent)
+
+        # Drop the oldest messages until the running total fits the budget
+        current_tokens = self._token_sum
+        start = 0
+        while start < len(history) and current_tokens > max_tokens:
+            current_tokens -= history[start].token_count
+            start += 1
+
+        # Message dicts are shared, not copied; LLM clients must not mutate them
+        context = [message._llm_dict for message in history[start:]]
+        self._last_ctx_key = cache_key
+        self._last_ctx = context
+        self._context_has_system = start < len(self._system_msgs)
+        return list(context)
 
     def clear_history(self, keep_system: bool = True) -> None:
         """
@@ -135,12 +183,11 @@ class BaseAgent(ABC):
         Args:
             keep_system: Whether to keep system messages
         """
-        if keep_system:
-            self.conversation_history = [
-                msg for msg in self.conversation_history if msg.role == "system"
-            ]
-        else:
-            self.conversation_history = []
+        self._recent.clear()
+        if not keep_system:
+            self._system_msgs.clear()
+        self._token_sum = sum(msg.token_count for msg in self._system_msgs)
+        self._last_ctx_key = None
 
         logger.info(f"Cleared history for agent {self.agent_id}")
 
@@ -151,13 +198,16 @@ class BaseAgent(ABC):
         Returns:
             Dictionary with agent statistics
         """
+        last_message = self._recent[-1] if self._recent else (
+            self._system_msgs[-1] if self._system_msgs else None
+        )
         return {
             "agent_id": self.agent_id,
-            "message_count": len(self.conversation_history),
+            "message_count": len(self._system_msgs) + len(self._recent),
             "total_tokens_used": self.total_tokens_used,
             "total_cost": self.total_cost,
-            "created_at": self.created_at.isoformat(),
-            "last_activity": self.conversation_history[-1].timestamp.isoformat() if self.conversation_history else None
+            "created_at": self._created_at_iso,
+            "last_activity": last_message.timestamp_iso if last_message else None
         }
 
     @abstractmethod
@@ -198,5 +248,5 @@ class BaseAgent(ABC):
         """
         self.total_tokens_used += tokens
         self.total_cost += cost
-        logger.debug(f"Agent {self.agent_id} used {tokens} tokens, cost: ${cost:.4f}")
+        logger.debug("Agent %s used %d tokens, cost: $%.4f", self.agent_id, tokens, cost)
 
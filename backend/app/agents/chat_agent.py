@@ -1,10 +1,31 @@
 """Chat agent implementation using LLM."""
 
-from typing import Any, Dict, List, Optional
+import asyncio
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import zlib
 from app.agents.base_agent import BaseAgent
+from app.cache.semantic_cache import SemanticCache
+from app.config import settings
 from app.llm.llm_factory import LLMFactory
 from app.utils.logger import logger
-from app.utils.helpers import calculate_cost
+from app.utils.helpers import calculate_cost, calculate_token_estimate
+
+# Rough (input, output) prices per 1K tokens, matched by model family
+_PRICING: Dict[str, Tuple[float, float]] = {
+    "claude": (0.003, 0.015),
+    "gpt-4": (0.01, 0.03),
+}
+
+
+@lru_cache(maxsize=64)
+def _model_rates(model: str) -> Tuple[float, float]:
+    """Resolve per-1K-token rates for a model ID (memoized per ID)."""
+    model = model.lower()
+    for family, rates in _PRICING.items():
+        if family in model:
+            return rates
+    return (0.0, 0.0)
 
 
 class ChatAgent(BaseAgent):
@@ -17,7 +38,8 @@ class ChatAgent(BaseAgent):
         llm_provider: Optional[str] = None,
         max_history: int = 50,
         max_tokens: int = 4000,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        semantic_cache: Optional[SemanticCache] = None
     ):
         """
         Initialize chat agent.
@@ -29,6 +51,7 @@ class ChatAgent(BaseAgent):
             max_history: Maximum conversation history length
             max_tokens: Maximum tokens in context
             temperature: Sampling temperature
+            semantic_cache: Optional cache for replies to near-duplicate messages
         """
         default_prompt = (
             "You are a helpful, knowledgeable, and friendly AI assistant. "
@@ -43,6 +66,10 @@ class ChatAgent(BaseAgent):
         self.llm_provider = llm_provider
         self.temperature = temperature
         self.llm_client = None
+        self.semantic_cache = semantic_cache
+        # Stable per-agent slot so an upstream proxy can pin the conversation
+        # to the worker that already holds its prefix in KV cache
+        self._slot_id = zlib.crc32(agent_id.encode()) % max(settings.llm_num_slots, 1)
 
     async def _get_llm_client(self):
         """Get or initialize LLM client."""
@@ -50,6 +77,89 @@ class ChatAgent(BaseAgent):
             self.llm_client = LLMFactory.get_client(self.llm_provider)
         return self.llm_client
 
+    def _request_context(self, client: Any, max_tokens: int) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Build the messages to send for this turn.
+
+        Everything before the newest message is marked as a cacheable prefix
+        for clients that support prompt caching.
+
+        Args:
+            client: LLM client instance
+            max_tokens: Maximum tokens in context
+
+        Returns:
+            Tuple of message list and extra chat arguments
+        """
+        context = self.get_conversation_context(max_tokens=max_tokens)
+        if len(context) > 1 and getattr(client, "supports_prompt_caching", False):
+            return context, {"cache_prefix_len": len(context) - 1}
+        return context, {}
+
+    def _cache_context(self) -> Optional[str]:
+        """Previous assistant reply, which scopes cache hits to the same conversational context."""
+        if self._recent and self._recent[-1].role == "assistant":
+            return self._recent[-1].content
+        return None
+
+    async def _lookup_cached_reply(
+        self,
+        cache_context: Optional[str],
+        user_input: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached reply and record the exchange in history on a hit.
+
+        Args:
+            cache_context: Previous assistant reply, from _cache_context()
+            user_input: User's input text, not yet added to history
+
+        Returns:
+            Result dictionary for the cached reply, or None on a miss
+        """
+        if self.semantic_cache is None:
+            return None
+        # Lookups embed the message; keep the model off the event loop
+        cached = await asyncio.to_thread(
+            self.semantic_cache.lookup, self.agent_id, cache_context, user_input
+        )
+        if cached is None:
+            return None
+        self.add_message("user", user_input)
+        self.add_message("assistant", cached["response"], metadata={
+            "model": cached.get("model"),
+            "usage": {},
+            "cached": True
+        })
+        return {
+            **cached,
+            "agent_id": self.agent_id,
+            "usage": {},
+            "metadata": {**cached.get("metadata", {}), "cached": True}
+        }
+
+    async def _store_cached_reply(
+        self,
+        cache_context: Optional[str],
+        user_input: str,
+        result: Dict[str, Any]
+    ) -> None:
+        """Cache a reply for near-duplicate messages unless it involved tool calls."""
+        if self.semantic_cache is not None and not result["metadata"]["tool_calls"]:
+            await asyncio.to_thread(
+                self.semantic_cache.store, self.agent_id, cache_context, user_input, result
+            )
+
+    def _record_usage(self, model: Optional[str], usage: Dict[str, Any]) -> None:
+        """Add a turn's token usage and estimated cost to the agent totals."""
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+
+        # Calculate cost (rough estimates)
+        input_rate, output_rate = _model_rates(model or "")
+        cost = calculate_cost(input_tokens, input_rate) + calculate_cost(output_tokens, output_rate)
+        self._update_token_usage(input_tokens + output_tokens, cost)
+
     async def process(self, user_input: str, **kwargs) -> Dict[str, Any]:
         """
         Process user input and generate response.
@@ -62,37 +172,44 @@ class ChatAgent(BaseAgent):
             Dictionary with response and metadata
         """
         try:
+            cache_context = self._cache_context()
+            cached = await self._lookup_cached_reply(cache_context, user_input)
+            if cached is not None:
+                return cached
+
             # Add user message to history
             self.add_message("user", user_input)
 
-            # Get conversation context
-            context = self.get_conversation_context(
-                max_tokens=kwargs.get("max_tokens", self.max_tokens)
-            )
-
             # Get LLM client
             client = await self._get_llm_client()
 
+            # Get conversation context
+            context, conversation_kwargs = self._request_context(
+                client, kwargs.get("max_tokens", self.max_tokens)
+            )
+
             # Generate response
             temperature = kwargs.get("temperature", self.temperature)
             response = await client.chat(
                 messages=context,
-                system_prompt=self.system_prompt if not any(m.get("role") == "system" for m in context) else None,
+                system_prompt=None if self._context_has_system else self.system_prompt,
                 temperature=temperature,
                 max_tokens=kwargs.get("max_tokens", 2048),
-                stream=kwargs.get("stream", False)
+                stream=kwargs.get("stream", False),
+                slot_id=self._slot_id,
+                **conversation_kwargs
             )
 
             # Extract content
             if isinstance(response, dict) and "stream" in response:
                 # Handle streaming response
-                content = ""
+                content_parts = []
                 async for chunk in response["stream"]:
                     if hasattr(chunk, "delta") and chunk.delta.content:
-                        content += chunk.delta.content
+                        content_parts.append(chunk.delta.content)
                     elif isinstance(chunk, str):
-                        content += chunk
-                response_content = content
+                        content_parts.append(chunk)
+                response_content = "".join(content_parts)
             else:
                 response_content = response.get("content", "")
 
@@ -104,20 +221,9 @@ class ChatAgent(BaseAgent):
 
             # Update token usage
             usage = response.get("usage", {})
-            input_tokens = usage.get("input_tokens", 0)
-            output_tokens = usage.get("output_tokens", 0)
-            self._update_token_usage(input_tokens + output_tokens)
-
-            # Calculate cost (rough estimates)
-            cost = 0.0
-            if "claude" in response.get("model", "").lower():
-                cost = calculate_cost(input_tokens, 0.003) + calculate_cost(output_tokens, 0.015)
-            elif "gpt-4" in response.get("model", "").lower():
-                cost = calculate_cost(input_tokens, 0.01) + calculate_cost(output_tokens, 0.03)
-
-            self._update_token_usage(0, cost)
+            self._record_usage(response.get("model"), usage)
 
-            return {
+            result = {
                 "response": response_content,
                 "agent_id": self.agent_id,
                 "model": response.get("model"),
@@ -128,6 +234,10 @@ class ChatAgent(BaseAgent):
                 }
             }
 
+            await self._store_cached_reply(cache_context, user_input, result)
+
+            return result
+
         except Exception as e:
             logger.error(f"Error processing chat message: {str(e)}", exc_info=True)
             error_msg = "I apologize, but I encountered an error processing your request."
@@ -148,12 +258,18 @@ class ChatAgent(BaseAgent):
         result = await self.process(user_input, **kwargs)
         return result["response"]
 
-    async def stream_response(self, user_input: str, **kwargs) -> Any:
+    async def stream_response(
+        self,
+        user_input: str,
+        usage: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> Any:
         """
         Stream response tokens.
 
         Args:
             user_input: User's input text
+            usage: Optional dict updated with the turn's token usage once the stream ends
             **kwargs: Additional parameters
 
         Yields:
@@ -163,27 +279,39 @@ class ChatAgent(BaseAgent):
             # Add user message
             self.add_message("user", user_input)
 
-            # Get context
-            context = self.get_conversation_context(
-                max_tokens=kwargs.get("max_tokens", self.max_tokens)
-            )
-
             # Get LLM client
             client = await self._get_llm_client()
 
+            # Get context
+            context, conversation_kwargs = self._request_context(
+                client, kwargs.get("max_tokens", self.max_tokens)
+            )
+
             # Stream response
-            full_response = ""
+            response_parts = []
             async for chunk in client.stream_response(
                 messages=context,
-                system_prompt=self.system_prompt if not any(m.get("role") == "system" for m in context) else None,
+                system_prompt=None if self._context_has_system else self.system_prompt,
                 temperature=kwargs.get("temperature", self.temperature),
-                max_tokens=kwargs.get("max_tokens", 2048)
+                max_tokens=kwargs.get("max_tokens", 2048),
+                slot_id=self._slot_id,
+                **conversation_kwargs
             ):
-                full_response += chunk
+                response_parts.append(chunk)
                 yield chunk
 
             # Add complete response to history
-            self.add_message("assistant", full_response)
+            response_content = "".join(response_parts)
+            self.add_message("assistant", response_content)
+
+            # Streams carry text only, so token usage is estimated from the text
+            turn_usage = {
+                "input_tokens": sum(calculate_token_estimate(str(m["content"])) for m in context),
+                "output_tokens": calculate_token_estimate(response_content)
+            }
+            self._record_usage(getattr(client, "model", None), turn_usage)
+            if usage is not None:
+                usage.update(turn_usage)
 
         except Exception as e:
             logger.error(f"Error streaming response: {str(e)}", exc_info=True)
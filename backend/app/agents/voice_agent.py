@@ -1,14 +1,24 @@
 """Voice agent implementation with audio handling."""
 
 from typing import Any, Dict, List, Optional
+import asyncio
+import re
 from app.agents.chat_agent import ChatAgent
+from app.cache.semantic_cache import SemanticCache
 from app.voice.elevenlabs_client import ElevenLabsClient
 from app.utils.logger import logger
 
+# Split streamed text after sentence-ending punctuation
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
 
 class VoiceAgent(ChatAgent):
     """Voice-enabled agent with TTS capabilities."""
 
+    # One TTS client (and HTTP connection pool) shared by all voice agents;
+    # the voice is chosen per request
+    _tts_client: Optional[ElevenLabsClient] = None
+
     def __init__(
         self,
         agent_id: str = "voice_agent",
@@ -17,7 +27,8 @@ class VoiceAgent(ChatAgent):
         max_history: int = 50,
         max_tokens: int = 4000,
         temperature: float = 0.7,
-        voice_id: Optional[str] = None
+        voice_id: Optional[str] = None,
+        semantic_cache: Optional[SemanticCache] = None
     ):
         """
         Initialize voice agent.
@@ -30,6 +41,7 @@ class VoiceAgent(ChatAgent):
             max_tokens: Maximum tokens in context
             temperature: Sampling temperature
             voice_id: ElevenLabs voice ID for TTS
+            semantic_cache: Optional cache for replies to near-duplicate messages
         """
         voice_prompt = (
             "You are a helpful, conversational AI assistant with a natural speaking style. "
@@ -42,16 +54,28 @@ class VoiceAgent(ChatAgent):
             llm_provider=llm_provider,
             max_history=max_history,
             max_tokens=max_tokens,
-            temperature=temperature
+            temperature=temperature,
+            semantic_cache=semantic_cache
         )
-        self.tts_client = None
         self.voice_id = voice_id
 
+    @classmethod
+    def get_shared_tts_client(cls) -> ElevenLabsClient:
+        """Get or initialize the TTS client shared by all voice agents."""
+        if cls._tts_client is None:
+            cls._tts_client = ElevenLabsClient()
+        return cls._tts_client
+
+    @classmethod
+    async def close_tts_client(cls) -> None:
+        """Close the shared TTS client."""
+        if cls._tts_client is not None:
+            await cls._tts_client.close()
+            cls._tts_client = None
+
     async def _get_tts_client(self):
         """Get or initialize TTS client."""
-        if self.tts_client is None:
-            self.tts_client = ElevenLabsClient(voice_id=self.voice_id)
-        return self.tts_client
+        return self.get_shared_tts_client()
 
     async def process(self, user_input: str, **kwargs) -> Dict[str, Any]:
         """
@@ -64,6 +88,9 @@ class VoiceAgent(ChatAgent):
         Returns:
             Dictionary with response, text, and audio metadata
         """
+        if kwargs.get("stream", False) and kwargs.get("generate_audio", True):
+            return await self._process_streaming(user_input, **kwargs)
+
         # Get text response from parent class
         result = await super().process(user_input, **kwargs)
         response_text = result["response"]
@@ -87,6 +114,96 @@ class VoiceAgent(ChatAgent):
 
         return result
 
+    async def _process_streaming(self, user_input: str, **kwargs) -> Dict[str, Any]:
+        """
+        Stream the LLM response and synthesize each sentence as it completes.
+
+        Text generation and TTS overlap, so audio is ready one sentence after
+        the text instead of after a second full round trip. Each sentence is
+        a separate MP3 clip, returned in order under ``audio["segments"]``.
+
+        Args:
+            user_input: User's input text (from STT)
+            **kwargs: Additional parameters
+
+        Returns:
+            Dictionary with response, text, and audio metadata
+        """
+        cache_context = self._cache_context()
+        cached = await self._lookup_cached_reply(cache_context, user_input)
+        if cached is not None:
+            cached["audio"] = None
+            try:
+                tts_client = await self._get_tts_client()
+                cached["audio"] = {
+                    "segments": [await tts_client.text_to_speech(text=cached["response"], voice_id=self.voice_id)],
+                    "format": "mp3",
+                    "voice_id": self.voice_id
+                }
+            except Exception as e:
+                logger.warning(f"Failed to generate audio: {str(e)}")
+            return cached
+
+        sentences: asyncio.Queue = asyncio.Queue()
+
+        try:
+            tts_client = await self._get_tts_client()
+        except Exception as e:
+            logger.warning(f"Failed to generate audio: {str(e)}")
+            tts_client = None
+
+        async def synthesize() -> List[bytes]:
+            segments = []
+            while True:
+                sentence = await sentences.get()
+                if sentence is None:
+                    return segments
+                segments.append(await tts_client.text_to_speech(text=sentence, voice_id=self.voice_id))
+
+        tts_task = asyncio.create_task(synthesize()) if tts_client is not None else None
+
+        parts = []
+        pending = ""
+        usage: Dict[str, Any] = {}
+        try:
+            async for chunk in self.stream_response(user_input, usage=usage, **kwargs):
+                parts.append(chunk)
+                *complete, pending = _SENTENCE_BOUNDARY.split(pending + chunk)
+                for sentence in complete:
+                    sentences.put_nowait(sentence)
+            if pending.strip():
+                sentences.put_nowait(pending)
+            sentences.put_nowait(None)
+        except Exception:
+            if tts_task is not None:
+                tts_task.cancel()
+            raise
+
+        result: Dict[str, Any] = {
+            "response": "".join(parts),
+            "agent_id": self.agent_id,
+            "model": getattr(self.llm_client, "model", None),
+            "usage": usage,
+            "metadata": {
+                "temperature": kwargs.get("temperature", self.temperature),
+                "tool_calls": []
+            }
+        }
+        await self._store_cached_reply(cache_context, user_input, result)
+
+        result["audio"] = None
+        if tts_task is not None:
+            try:
+                result["audio"] = {
+                    "segments": await tts_task,
+                    "format": "mp3",
+                    "voice_id": self.voice_id
+                }
+            except Exception as e:
+                logger.warning(f"Failed to generate audio: {str(e)}")
+
+        return result
+
     async def text_to_speech(self, text: str, voice_id: Optional[str] = None) -> bytes:
         """
         Convert text to speech audio.
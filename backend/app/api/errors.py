@@ -0,0 +1,35 @@
+"""Error logging for API request handlers."""
+
+import anthropic
+import httpx
+import openai
+from app.utils.logger import logger
+
+# Expected upstream failures (rate limits, timeouts, bad responses) that
+# don't need a traceback in the logs
+TRANSIENT_ERRORS = (
+    TimeoutError,
+    httpx.TimeoutException,
+    httpx.HTTPStatusError,
+    anthropic.RateLimitError,
+    anthropic.APITimeoutError,
+    anthropic.APIConnectionError,
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+)
+
+
+def log_api_error(message: str, error: Exception) -> None:
+    """
+    Log a request-path error, with a traceback only for unexpected errors.
+
+    Args:
+        message: Short description of what failed
+        error: The exception raised
+    """
+    if isinstance(error, TRANSIENT_ERRORS):
+        logger.warning(f"{message}: {type(error).__name__}: {str(error)}")
+    else:
+        logger.error(f"{message}: {str(error)}", exc_info=error)
+
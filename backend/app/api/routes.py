@@ -1,23 +1,35 @@
 """FastAPI routes for the application."""
 
+import asyncio
+import threading
+from functools import lru_cache
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, HTTPException, Depends, Body
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, HTTPException, Depends, Body, Response
+from pydantic import BaseModel, ConfigDict, Field
 from app.agents.chat_agent import ChatAgent
 from app.agents.voice_agent import VoiceAgent
+from app.agents.agent_pool import AgentPool
 from app.rag.vectorstore import VectorStore
 from app.rag.retriever import RAGRetriever
 from app.mcp.server import MCPServer
+from app.cache.semantic_cache import SemanticCache
+from app.config import settings
 from app.voice.vapi_client import VapiClient
-from app.utils.logger import logger
+from app.api.errors import log_api_error
 
 router = APIRouter()
 
-# Agent instances (in production, use dependency injection)
-_agents: Dict[str, Any] = {}
+# Agent instances, evicted when idle (in production, use dependency injection)
+_agents = AgentPool(maxsize=settings.agent_pool_max_size, ttl=settings.agent_pool_ttl)
 
 
-class ChatRequest(BaseModel):
+class RequestModel(BaseModel):
+    """Base for request bodies: immutable once validated, unknown fields dropped."""
+
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True, frozen=True)
+
+
+class ChatRequest(RequestModel):
     """Chat request model."""
 
     message: str = Field(..., description="User message")
@@ -29,13 +41,15 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     """Chat response model."""
 
+    model_config = ConfigDict(frozen=True)
+
     response: str
     agent_id: str
     model: Optional[str] = None
     usage: Optional[Dict[str, int]] = None
 
 
-class VoiceCallRequest(BaseModel):
+class VoiceCallRequest(RequestModel):
     """Voice call request model."""
 
     phone_number: str = Field(..., description="Phone number to call")
@@ -43,7 +57,7 @@ class VoiceCallRequest(BaseModel):
     assistant_config: Optional[Dict[str, Any]] = None
 
 
-class RAGIngestRequest(BaseModel):
+class RAGIngestRequest(RequestModel):
     """RAG document ingestion request."""
 
     text: str = Field(..., description="Document text")
@@ -52,20 +66,75 @@ class RAGIngestRequest(BaseModel):
     chunk: Optional[bool] = Field(default=False, description="Whether to chunk the document")
 
 
-class RAGSearchRequest(BaseModel):
+class RAGSearchRequest(RequestModel):
     """RAG search request."""
 
     query: str = Field(..., description="Search query")
     top_k: Optional[int] = Field(default=5, ge=1, le=20)
 
 
-class MCPExecuteRequest(BaseModel):
+class MCPExecuteRequest(RequestModel):
     """MCP tool execution request."""
 
     tool_name: str = Field(..., description="Tool name")
     parameters: Dict[str, Any] = Field(default_factory=dict, description="Tool parameters")
 
 
+@lru_cache(maxsize=1)
+def get_vapi_client() -> VapiClient:
+    """Get the shared Vapi client."""
+    return VapiClient()
+
+
+@lru_cache(maxsize=1)
+def get_mcp_server() -> MCPServer:
+    """Get the shared MCP server."""
+    return MCPServer()
+
+
+# Sync dependencies run on worker threads and lru_cache does not stop two
+# threads building at once; the vector store connects and loads a model
+_vector_store_lock = threading.Lock()
+
+
+def get_vector_store() -> VectorStore:
+    """Get the shared vector store, built once even when first calls race."""
+    with _vector_store_lock:
+        return _build_vector_store()
+
+
+@lru_cache(maxsize=1)
+def _build_vector_store() -> VectorStore:
+    """Build the shared vector store."""
+    search_cache = (
+        SemanticCache(threshold=settings.search_cache_threshold)
+        if settings.search_cache_enabled else None
+    )
+    return VectorStore(search_cache=search_cache)
+
+
+@lru_cache(maxsize=1)
+def get_rag_retriever() -> RAGRetriever:
+    """Get the shared RAG retriever (backed by the shared vector store)."""
+    return RAGRetriever(vector_store=get_vector_store())
+
+
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> SemanticCache:
+    """Get the shared semantic cache for chat replies."""
+    return SemanticCache()
+
+
+async def close_clients() -> None:
+    """Close pooled clients that hold open connections."""
+    if get_vapi_client.cache_info().currsize:
+        await get_vapi_client().close()
+        get_vapi_client.cache_clear()
+    if get_mcp_server.cache_info().currsize:
+        await get_mcp_server().aclose()
+        get_mcp_server.cache_clear()
+
+
 def get_agent(agent_id: str = "chat_agent") -> ChatAgent:
     """
     Get or create agent instance.
@@ -76,12 +145,13 @@ def get_agent(agent_id: str = "chat_agent") -> ChatAgent:
     Returns:
         Agent instance
     """
-    if agent_id not in _agents:
+    def create_agent() -> ChatAgent:
+        semantic_cache = get_semantic_cache() if settings.semantic_cache_enabled else None
         if agent_id == "voice_agent":
-            _agents[agent_id] = VoiceAgent(agent_id=agent_id)
-        else:
-            _agents[agent_id] = ChatAgent(agent_id=agent_id)
-    return _agents[agent_id]
+            return VoiceAgent(agent_id=agent_id, semantic_cache=semantic_cache)
+        return ChatAgent(agent_id=agent_id, semantic_cache=semantic_cache)
+
+    return _agents.get_or_create(agent_id, create_agent)
 
 
 @router.post("/chat", response_model=ChatResponse)
@@ -110,12 +180,15 @@ async def chat(request: ChatRequest):
             usage=result.get("usage")
         )
     except Exception as e:
-        logger.error(f"Error in chat endpoint: {str(e)}", exc_info=True)
+        log_api_error("Error in chat endpoint", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/voice/call")
-async def initiate_voice_call(request: VoiceCallRequest):
+async def initiate_voice_call(
+    request: VoiceCallRequest,
+    vapi_client: VapiClient = Depends(get_vapi_client)
+):
     """
     Initiate a voice call using Vapi.
 
@@ -126,16 +199,14 @@ async def initiate_voice_call(request: VoiceCallRequest):
         Call creation response
     """
     try:
-        vapi_client = VapiClient()
         result = await vapi_client.create_call(
             phone_number=request.phone_number,
             assistant_id=request.assistant_id,
             assistant_config=request.assistant_config
         )
-        await vapi_client.close()
         return result
     except Exception as e:
-        logger.error(f"Error initiating voice call: {str(e)}", exc_info=True)
+        log_api_error("Error initiating voice call", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -158,20 +229,25 @@ async def list_agents():
 
 
 @router.post("/rag/ingest")
-async def ingest_document(request: RAGIngestRequest):
+async def ingest_document(
+    request: RAGIngestRequest,
+    vector_store: VectorStore = Depends(get_vector_store)
+):
     """
     Ingest a document into the RAG system.
 
     Args:
         request: Document ingestion request
+        vector_store: Shared vector store
 
     Returns:
         Ingestion result
     """
     try:
-        vector_store = VectorStore()
         if request.chunk:
-            doc_ids = vector_store.add_document_chunked(
+            # Chroma and the embedding model are blocking; keep them off the event loop
+            doc_ids = await asyncio.to_thread(
+                vector_store.add_document_chunked,
                 text=request.text,
                 document_id=request.document_id,
                 metadata=request.metadata
@@ -182,7 +258,8 @@ async def ingest_document(request: RAGIngestRequest):
                 "chunked": True
             }
         else:
-            doc_id = vector_store.add_document(
+            doc_id = await asyncio.to_thread(
+                vector_store.add_document,
                 text=request.text,
                 document_id=request.document_id,
                 metadata=request.metadata
@@ -193,71 +270,84 @@ async def ingest_document(request: RAGIngestRequest):
                 "chunked": False
             }
     except Exception as e:
-        logger.error(f"Error ingesting document: {str(e)}", exc_info=True)
+        log_api_error("Error ingesting document", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/rag/search")
-async def search_rag(query: str, top_k: int = 5):
+async def search_rag(
+    query: str,
+    top_k: int = 5,
+    retriever: RAGRetriever = Depends(get_rag_retriever)
+):
     """
     Search the RAG knowledge base.
 
     Args:
         query: Search query
         top_k: Number of results
+        retriever: Shared RAG retriever
 
     Returns:
         Search results
     """
     try:
-        retriever = RAGRetriever()
-        results = retriever.retrieve(query=query, top_k=top_k)
+        hits = await asyncio.to_thread(retriever.retrieve, query=query, top_k=top_k)
+        results = [result.as_dict() for result in hits]
         return {
             "query": query,
             "results": results,
             "count": len(results)
         }
     except Exception as e:
-        logger.error(f"Error searching RAG: {str(e)}", exc_info=True)
+        log_api_error("Error searching RAG", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/mcp/execute")
-async def execute_mcp_tool(request: MCPExecuteRequest):
+async def execute_mcp_tool(
+    request: MCPExecuteRequest,
+    mcp_server: MCPServer = Depends(get_mcp_server)
+):
     """
     Execute an MCP tool.
 
     Args:
         request: Tool execution request
+        mcp_server: Shared MCP server
 
     Returns:
         Tool execution result
     """
     try:
-        mcp_server = MCPServer()
         result = await mcp_server.execute_tool(
             tool_name=request.tool_name,
             parameters=request.parameters
         )
         return result
     except Exception as e:
-        logger.error(f"Error executing MCP tool: {str(e)}", exc_info=True)
+        log_api_error("Error executing MCP tool", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/mcp/tools")
-async def list_mcp_tools():
+async def list_mcp_tools(mcp_server: MCPServer = Depends(get_mcp_server)):
     """
     List all available MCP tools.
 
+    Args:
+        mcp_server: Shared MCP server
+
     Returns:
         List of tool schemas
     """
     try:
-        mcp_server = MCPServer()
-        tools = mcp_server.get_tools()
-        return {"tools": tools}
+        # Schemas only change on registration, so reuse their serialized form
+        return Response(
+            content=b'{"tools":%s}' % mcp_server.get_tools_json(),
+            media_type="application/json"
+        )
     except Exception as e:
-        logger.error(f"Error listing MCP tools: {str(e)}", exc_info=True)
+        log_api_error("Error listing MCP tools", e)
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1,10 +1,15 @@
 """WebSocket endpoints for real-time communication."""
 
-from typing import Dict, Set
+from typing import Any, Dict, Set
+import asyncio
+import time
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from app.agents.chat_agent import ChatAgent
+from app.agents.agent_pool import AgentPool
+from app.config import settings
+from app.api.errors import log_api_error
 from app.utils.logger import logger
-import json
 
 router = APIRouter()
 
@@ -42,6 +47,18 @@ class ConnectionManager:
             del self.active_connections[client_id]
             logger.info(f"WebSocket client disconnected: {client_id}")
 
+    @staticmethod
+    async def _send(websocket: WebSocket, message: Any):
+        """
+        Serialize and send a message as a text frame.
+
+        Args:
+            websocket: WebSocket connection
+            message: JSON-serializable message
+        """
+        # Text frames keep browser clients on JSON.parse(event.data)
+        await websocket.send_text(orjson.dumps(message).decode())
+
     async def send_personal_message(self, message: dict, client_id: str):
         """
         Send message to specific client.
@@ -52,7 +69,7 @@ class ConnectionManager:
         """
         if client_id in self.active_connections:
             try:
-                await self.active_connections[client_id].send_json(message)
+                await self._send(self.active_connections[client_id], message)
             except Exception as e:
                 logger.error(f"Error sending message to {client_id}: {str(e)}")
                 self.disconnect(client_id)
@@ -64,26 +81,47 @@ class ConnectionManager:
         Args:
             message: Message dictionary
         """
-        disconnected = []
-        for client_id, connection in self.active_connections.items():
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to {client_id}: {str(e)}")
-                disconnected.append(client_id)
-
-        for client_id in disconnected:
-            self.disconnect(client_id)
+        # Encode once and write to every client concurrently so one slow
+        # connection doesn't hold up the rest
+        payload = orjson.dumps(message).decode()
+        connections = list(self.active_connections.items())
+        results = await asyncio.gather(
+            *(connection.send_text(payload) for _, connection in connections),
+            return_exceptions=True
+        )
+
+        for (client_id, _), result in zip(connections, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error broadcasting to {client_id}: {str(result)}")
+                self.disconnect(client_id)
 
 
 manager = ConnectionManager()
 
 
+# Agents keyed by client ID so reconnecting clients keep their conversation
+agent_pool = AgentPool(maxsize=settings.agent_pool_max_size, ttl=settings.agent_pool_ttl)
+
+# Seconds a disconnected client's agent is kept for a reconnect
+DISCONNECTED_AGENT_TTL = 300.0
+
+# Per-client queue bound; a slow LLM backs up into the client's reads
+QUEUE_MAXSIZE = 16
+
+# Coalesce streamed tokens into frames of roughly this size / age
+DELTA_MIN_CHARS = 50
+DELTA_MAX_DELAY = 0.01
+
+
 @router.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
     """
     WebSocket endpoint for real-time chat.
 
+    Reading, LLM processing and sending run as separate tasks connected by
+    bounded queues, so pings are answered while a response is generated.
+    Responses are streamed as "delta" frames followed by a "done" frame.
+
     Args:
         websocket: WebSocket connection
         client_id: Client identifier
@@ -91,7 +129,55 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
     await manager.connect(websocket, client_id)
 
     # Create or get agent for this client
-    agent = ChatAgent(agent_id=f"ws_{client_id}")
+    agent = agent_pool.get_or_create(client_id, lambda: ChatAgent(agent_id=f"ws_{client_id}"))
+    incoming: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_MAXSIZE)
+    outgoing: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_MAXSIZE)
+
+    async def reader():
+        """Receive frames and route them to the worker or straight to the sender."""
+        while True:
+            data = orjson.loads(await websocket.receive_text())
+
+            message_type = data.get("type", "message")
+            if message_type == "message":
+                await incoming.put(data.get("message", ""))
+            elif message_type == "ping":
+                # Respond to ping without waiting for the agent
+                await outgoing.put({"type": "pong"})
+
+    async def worker():
+        """Stream agent responses for user messages, one message at a time."""
+        while True:
+            user_message = await incoming.get()
+            try:
+                buffer = []
+                buffered = 0
+                last_flush = time.monotonic()
+                async for chunk in agent.stream_response(user_message):
+                    buffer.append(chunk)
+                    buffered += len(chunk)
+                    now = time.monotonic()
+                    if buffered >= DELTA_MIN_CHARS or now - last_flush >= DELTA_MAX_DELAY:
+                        await outgoing.put({"type": "delta", "text": "".join(buffer)})
+                        buffer.clear()
+                        buffered = 0
+                        last_flush = now
+
+                if buffer:
+                    await outgoing.put({"type": "delta", "text": "".join(buffer)})
+                await outgoing.put({"type": "done", "agent_id": agent.agent_id})
+            except Exception as e:
+                log_api_error("Error processing message", e)
+                await outgoing.put({
+                    "type": "error",
+                    "message": f"Error processing message: {str(e)}"
+                })
+
+    async def sender():
+        """Drain the outgoing queue to the socket."""
+        while True:
+            message = await outgoing.get()
+            await manager.send_personal_message(message, client_id)
 
     try:
         # Send welcome message
@@ -101,44 +187,23 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
             "client_id": client_id
         }, client_id)
 
-        while True:
-            # Receive message
-            data = await websocket.receive_json()
-
-            message_type = data.get("type", "message")
-            user_message = data.get("message", "")
-
-            if message_type == "message":
-                # Process message with agent
-                try:
-                    result = await agent.process(user_message)
-
-                    # Send response
-                    await manager.send_personal_message({
-                        "type": "response",
-                        "message": result["response"],
-                        "agent_id": result["agent_id"],
-                        "model": result.get("model"),
-                        "usage": result.get("usage")
-                    }, client_id)
-
-                except Exception as e:
-                    logger.error(f"Error processing message: {str(e)}", exc_info=True)
-                    await manager.send_personal_message({
-                        "type": "error",
-                        "message": f"Error processing message: {str(e)}"
-                    }, client_id)
+        tasks = [asyncio.create_task(task()) for task in (reader, worker, sender)]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-            elif message_type == "ping":
-                # Respond to ping
-                await manager.send_personal_message({
-                    "type": "pong"
-                }, client_id)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
 
     except WebSocketDisconnect:
         manager.disconnect(client_id)
         logger.info(f"WebSocket client disconnected: {client_id}")
     except Exception as e:
-        logger.error(f"WebSocket error: {str(e)}", exc_info=True)
+        log_api_error("WebSocket error", e)
         manager.disconnect(client_id)
-
+    finally:
+        agent_pool.expire_in(client_id, DISCONNECTED_AGENT_TTL)
@@ -0,0 +1,162 @@
+"""Semantic cache for LLM replies keyed by query embedding similarity."""
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from app.config import settings
+from app.rag.quantization import int8_similarity, quantize_int8
+from app.utils.logger import logger
+
+
+class SemanticCache:
+    """LRU cache that returns a stored reply for near-duplicate user messages."""
+
+    def __init__(
+        self,
+        embedding_generator: Optional[Any] = None,
+        threshold: Optional[float] = None,
+        max_contexts: int = 256,
+        max_entries_per_context: int = 64,
+        quantize: Optional[bool] = None
+    ):
+        """
+        Initialize semantic cache.
+
+        Args:
+            embedding_generator: Embedding generator (defaults to the RAG embedder, created lazily)
+            threshold: Minimum cosine similarity for a cache hit
+            max_contexts: Maximum number of (agent, context) buckets kept
+            max_entries_per_context: Maximum cached replies per bucket
+            quantize: Store embeddings as int8 (defaults to settings.embedding_quantize)
+        """
+        self._embedding_generator = embedding_generator
+        self.threshold = threshold if threshold is not None else settings.semantic_cache_threshold
+        self.max_contexts = max_contexts
+        self.max_entries_per_context = max_entries_per_context
+        self.quantize = quantize if quantize is not None else settings.embedding_quantize
+        # Entries are (embedding, scale, result); scale is only used when quantized
+        self._buckets: "OrderedDict[Tuple[str, int], OrderedDict[str, Tuple[np.ndarray, float, Dict[str, Any]]]]" = OrderedDict()
+
+    @property
+    def embedding_generator(self) -> Any:
+        """Get or initialize the embedding generator."""
+        if self._embedding_generator is None:
+            from app.rag.embeddings import EmbeddingGenerator
+            self._embedding_generator = EmbeddingGenerator()
+        return self._embedding_generator
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Normalize message text for exact-match lookups."""
+        return " ".join(text.lower().split())
+
+    def _embed(self, text: str) -> np.ndarray:
+        """Embed text as a unit-length vector."""
+        vector = np.asarray(self.embedding_generator.generate(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @staticmethod
+    def _quantize(vector: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Quantize a single embedding to int8 with its scale."""
+        quantized, scales = quantize_int8(vector[None, :])
+        return quantized[0], float(scales[0])
+
+    def lookup(
+        self,
+        agent_id: str,
+        context: Optional[str],
+        message: str,
+        embedding: Optional[np.ndarray] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached reply for a message.
+
+        Args:
+            agent_id: Agent the message is addressed to
+            context: Previous assistant reply, so context-dependent answers don't misfire
+            message: User message
+            embedding: Precomputed unit-length embedding of the message, if available
+
+        Returns:
+            Cached result dictionary or None on a miss
+        """
+        bucket_key = (agent_id, hash(context))
+        bucket = self._buckets.get(bucket_key)
+        if not bucket:
+            return None
+
+        self._buckets.move_to_end(bucket_key)
+        normalized = self._normalize(message)
+        entry = bucket.get(normalized)
+        if entry is not None:
+            bucket.move_to_end(normalized)
+            return entry[2]
+
+        try:
+            query = self._embed(normalized) if embedding is None else embedding
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {str(e)}")
+            return None
+
+        keys = list(bucket.keys())
+        entries = [bucket[key] for key in keys]
+        vectors = np.stack([entry[0] for entry in entries])
+        if self.quantize:
+            query_q, query_scale = self._quantize(query)
+            scales = np.array([entry[1] for entry in entries], dtype=np.float32)
+            scores = int8_similarity(vectors, scales, query_q, query_scale)
+        else:
+            scores = vectors @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+
+        bucket.move_to_end(keys[best])
+        logger.debug(f"Semantic cache hit for agent {agent_id} (score {scores[best]:.3f})")
+        return bucket[keys[best]][2]
+
+    def store(
+        self,
+        agent_id: str,
+        context: Optional[str],
+        message: str,
+        result: Dict[str, Any],
+        embedding: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Cache a reply for a message.
+
+        Args:
+            agent_id: Agent the message was addressed to
+            context: Previous assistant reply
+            message: User message
+            result: Result dictionary to return on later hits
+            embedding: Precomputed unit-length embedding of the message, if available
+        """
+        normalized = self._normalize(message)
+        try:
+            if embedding is None:
+                embedding = self._embed(normalized)
+        except Exception as e:
+            logger.warning(f"Semantic cache store failed: {str(e)}")
+            return
+
+        bucket_key = (agent_id, hash(context))
+        bucket = self._buckets.setdefault(bucket_key, OrderedDict())
+        self._buckets.move_to_end(bucket_key)
+        if self.quantize:
+            embedding, scale = self._quantize(embedding)
+        else:
+            scale = 1.0
+        bucket[normalized] = (embedding, scale, result)
+        bucket.move_to_end(normalized)
+
+        if len(bucket) > self.max_entries_per_context:
+            bucket.popitem(last=False)
+        if len(self._buckets) > self.max_contexts:
+            self._buckets.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached replies."""
+        self._buckets.clear()
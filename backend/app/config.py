@@ -1,6 +1,7 @@
 """Configuration management using Pydantic Settings."""
 
-from typing import List, Optional
+from functools import lru_cache
+from typing import ClassVar, Dict, List, Optional
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -26,10 +27,15 @@ class Settings(BaseSettings):
     )
 
     # LLM APIs
+    # Optional credentials are plain fields: each settings source (env vars,
+    # .env) is read once per Settings() no matter how many fields it has, so
+    # per-provider lazy groups would only add extra .env parses. If a slow
+    # secret backend is added, resolve it in a custom settings source instead.
     anthropic_api_key: Optional[str] = Field(default=None, alias="ANTHROPIC_API_KEY")
     openai_api_key: Optional[str] = Field(default=None, alias="OPENAI_API_KEY")
     anthropic_model: str = Field(default="claude-3-5-sonnet-20241022", alias="ANTHROPIC_MODEL")
     openai_model: str = Field(default="gpt-4-turbo-preview", alias="OPENAI_MODEL")
+    llm_num_slots: int = Field(default=4, alias="LLM_NUM_SLOTS")
 
     # Voice Services
     vapi_api_key: Optional[str] = Field(default=None, alias="VAPI_API_KEY")
@@ -46,6 +52,7 @@ class Settings(BaseSettings):
     chroma_host: str = Field(default="localhost", alias="CHROMA_HOST")
     chroma_port: int = Field(default=8000, alias="CHROMA_PORT")
     chroma_collection_name: str = Field(default="ai_agent_documents", alias="CHROMA_COLLECTION_NAME")
+    chroma_batch_size: int = Field(default=128, alias="CHROMA_BATCH_SIZE")
     pinecone_api_key: Optional[str] = Field(default=None, alias="PINECONE_API_KEY")
     pinecone_environment: Optional[str] = Field(default=None, alias="PINECONE_ENVIRONMENT")
     pinecone_index_name: Optional[str] = Field(default=None, alias="PINECONE_INDEX_NAME")
@@ -53,12 +60,33 @@ class Settings(BaseSettings):
     # Embeddings
     embedding_model: str = Field(default="all-MiniLM-L6-v2", alias="EMBEDDING_MODEL")
     embedding_device: str = Field(default="cpu", alias="EMBEDDING_DEVICE")
+    # Inference backend: "torch" (default) or "torch-compile"
+    embedding_backend: str = Field(default="torch", alias="EMBEDDING_BACKEND")
+    # Keep only the leading components of each embedding (Matryoshka-trained
+    # models such as nomic-embed or mxbai); unset keeps the full dimension
+    embedding_dim: Optional[int] = Field(default=None, alias="EMBEDDING_DIM")
+    # Keep in-memory embeddings as int8 with per-vector scales instead of float32
+    embedding_quantize: bool = Field(default=False, alias="EMBEDDING_QUANTIZE")
+    # Recently embedded texts kept per generator (0 disables the cache)
+    embedding_cache_size: int = Field(default=10000, alias="EMBEDDING_CACHE_SIZE")
 
     # RAG Settings
     rag_top_k: int = Field(default=5, alias="RAG_TOP_K")
     rag_chunk_size: int = Field(default=1000, alias="RAG_CHUNK_SIZE")
     rag_chunk_overlap: int = Field(default=200, alias="RAG_CHUNK_OVERLAP")
 
+    # Agent pool
+    agent_pool_max_size: int = Field(default=1024, alias="AGENT_POOL_MAX_SIZE")
+    agent_pool_ttl: float = Field(default=3600.0, alias="AGENT_POOL_TTL")
+
+    # Semantic cache for chat replies
+    semantic_cache_enabled: bool = Field(default=False, alias="SEMANTIC_CACHE_ENABLED")
+    semantic_cache_threshold: float = Field(default=0.92, alias="SEMANTIC_CACHE_THRESHOLD")
+
+    # Semantic cache for vector store searches
+    search_cache_enabled: bool = Field(default=False, alias="SEARCH_CACHE_ENABLED")
+    search_cache_threshold: float = Field(default=0.95, alias="SEARCH_CACHE_THRESHOLD")
+
     # Database
     database_url: Optional[str] = Field(default=None, alias="DATABASE_URL")
 
@@ -71,13 +99,32 @@ class Settings(BaseSettings):
     # Rate Limiting
     rate_limit_per_minute: int = Field(default=60, alias="RATE_LIMIT_PER_MINUTE")
 
+    # Parsed CORS origin strings, shared across Settings() reconstructions
+    _cors_cache: ClassVar[Dict[str, List[str]]] = {}
+
     @field_validator("cors_origins", mode="before")
     @classmethod
     def parse_cors_origins(cls, v):
-        """Parse CORS origins from string or list."""
-        if isinstance(v, str):
-            return [origin.strip() for origin in v.split(",")]
-        return v
+        """Parse CORS origins from a comma-separated string or list."""
+        if not isinstance(v, str):
+            return v
+        origins = cls._cors_cache.get(v)
+        if origins is None:
+            origins = [origin for origin in map(str.strip, v.split(",")) if origin]
+            cls._cors_cache[v] = origins
+        return list(origins)
+
+    @field_validator("embedding_backend")
+    @classmethod
+    def validate_embedding_backend(cls, v: str) -> str:
+        """Reject inference backends the pinned sentence-transformers cannot load."""
+        backend = v.strip().lower()
+        if backend not in ("torch", "torch-compile"):
+            raise ValueError(
+                f"Unsupported embedding backend {v!r}; expected 'torch' or 'torch-compile' "
+                "(ONNX/OpenVINO backends need sentence-transformers >= 3.2)"
+            )
+        return backend
 
     @property
     def is_production(self) -> bool:
@@ -90,6 +137,21 @@ class Settings(BaseSettings):
         return self.app_env.lower() == "development"
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the process-wide settings instance.
+
+    The .env file is parsed and validated once. Application code reads the
+    module-level ``settings`` built from this; tests patch attributes on it
+    rather than rebuilding it.
+
+    Returns:
+        Settings instance
+    """
+    return Settings()
+
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
 
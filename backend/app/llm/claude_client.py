@@ -8,9 +8,47 @@ from app.config import settings
 from app.utils.logger import logger
 
 
+def _to_claude_messages(
+    messages: List[Dict[str, str]],
+    cache_prefix_len: int = 0
+) -> List[MessageParam]:
+    """
+    Convert messages to Claude format, copying only when extra keys must be stripped.
+
+    Args:
+        messages: List of message dictionaries
+        cache_prefix_len: Number of leading messages that are stable across
+            turns; the last of them gets a prompt-cache breakpoint
+
+    Returns:
+        List of Claude message params
+    """
+    if all(len(msg) == 2 and "role" in msg and "content" in msg for msg in messages):
+        claude_messages = messages
+    else:
+        claude_messages = [{"role": msg["role"], "content": msg["content"]} for msg in messages]
+
+    if 0 < cache_prefix_len <= len(claude_messages):
+        # Copy before marking so the caller's (shared) message dicts stay untouched
+        claude_messages = list(claude_messages)
+        last = claude_messages[cache_prefix_len - 1]
+        claude_messages[cache_prefix_len - 1] = {
+            "role": last["role"],
+            "content": [{
+                "type": "text",
+                "text": last["content"],
+                "cache_control": {"type": "ephemeral"}
+            }]
+        }
+    return claude_messages
+
+
 class ClaudeClient:
     """Client for interacting with Anthropic Claude API."""
 
+    # The stable conversation prefix can be marked for Anthropic prompt caching
+    supports_prompt_caching = True
+
     def __init__(self, api_key: Optional[str] = None):
         """
         Initialize Claude client.
@@ -24,6 +62,8 @@ class ClaudeClient:
 
         self.client = AsyncAnthropic(api_key=self.api_key)
         self.model = settings.anthropic_model
+        # Request fields that are fixed for the client's lifetime
+        self._base_params: Dict[str, Any] = {"model": self.model}
         logger.info(f"Initialized Claude client with model: {self.model}")
 
     async def chat(
@@ -33,7 +73,9 @@ class ClaudeClient:
         max_tokens: int = 4096,
         temperature: float = 0.7,
         tools: Optional[List[ToolParam]] = None,
-        stream: bool = False
+        stream: bool = False,
+        slot_id: Optional[int] = None,
+        cache_prefix_len: int = 0
     ) -> Dict[str, Any]:
         """
         Send chat completion request to Claude.
@@ -45,20 +87,19 @@ class ClaudeClient:
             temperature: Sampling temperature
             tools: Optional list of tools for function calling
             stream: Whether to stream the response
+            slot_id: Upstream cache slot hint, sent as the X-LLM-Slot header
+            cache_prefix_len: Number of leading messages to cache as a prompt prefix
 
         Returns:
             Response dictionary with content and metadata
         """
         try:
             # Convert messages to Claude format
-            claude_messages: List[MessageParam] = [
-                {"role": msg["role"], "content": msg["content"]}
-                for msg in messages
-            ]
+            claude_messages = _to_claude_messages(messages, cache_prefix_len)
 
             # Prepare request parameters
             params: Dict[str, Any] = {
-                "model": self.model,
+                **self._base_params,
                 "messages": claude_messages,
                 "max_tokens": max_tokens,
                 "temperature": temperature,
@@ -67,6 +108,9 @@ class ClaudeClient:
             if system_prompt:
                 params["system"] = system_prompt
 
+            if slot_id is not None:
+                params["extra_headers"] = {"X-LLM-Slot": str(slot_id)}
+
             if tools:
                 params["tools"] = tools
 
@@ -76,21 +120,24 @@ class ClaudeClient:
             # Non-streaming request
             response = await self.client.messages.create(**params)
 
-            # Extract content
-            content = ""
-            tool_uses = []
-
-            if response.content:
-                for block in response.content:
+            # Extract content; a single text block is the common case
+            blocks = response.content
+            if len(blocks) == 1 and blocks[0].type == "text":
+                content = blocks[0].text
+                tool_uses = []
+            else:
+                content_parts: List[str] = []
+                tool_uses = []
+                for block in blocks or ():
                     if block.type == "text":
-                        content += block.text
+                        content_parts.append(block.text)
                     elif block.type == "tool_use":
                         tool_uses.append({
                             "id": block.id,
                             "name": block.name,
                             "input": block.input
                         })
-
+                content = "".join(content_parts)
             result = {
                 "content": content,
                 "tool_uses": tool_uses,
@@ -102,7 +149,7 @@ class ClaudeClient:
                 "stop_reason": response.stop_reason
             }
 
-            logger.debug(f"Claude response: {len(content)} chars, {result['usage']['output_tokens']} tokens")
+            logger.debug("Claude response: %d chars, %d tokens", len(content), result["usage"]["output_tokens"])
             return result
 
         except Exception as e:
@@ -130,7 +177,9 @@ class ClaudeClient:
         messages: List[Dict[str, str]],
         system_prompt: Optional[str] = None,
         max_tokens: int = 4096,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        slot_id: Optional[int] = None,
+        cache_prefix_len: int = 0
     ) -> AsyncIterator[str]:
         """
         Stream chat response tokens.
@@ -140,18 +189,17 @@ class ClaudeClient:
             system_prompt: Optional system prompt
             max_tokens: Maximum tokens in response
             temperature: Sampling temperature
+            slot_id: Upstream cache slot hint, sent as the X-LLM-Slot header
+            cache_prefix_len: Number of leading messages to cache as a prompt prefix
 
         Yields:
             Text chunks from the stream
         """
         try:
-            claude_messages: List[MessageParam] = [
-                {"role": msg["role"], "content": msg["content"]}
-                for msg in messages
-            ]
+            claude_messages = _to_claude_messages(messages, cache_prefix_len)
 
             params: Dict[str, Any] = {
-                "model": self.model,
+                **self._base_params,
                 "messages": claude_messages,
                 "max_tokens": max_tokens,
                 "temperature": temperature,
@@ -160,6 +208,9 @@ class ClaudeClient:
             if system_prompt:
                 params["system"] = system_prompt
 
+            if slot_id is not None:
+                params["extra_headers"] = {"X-LLM-Slot": str(slot_id)}
+
             async with self.client.messages.stream(**params) as stream:
                 async for text in stream.text_stream:
                     yield text
@@ -1,7 +1,8 @@
 """Factory for LLM client selection and management."""
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, FrozenSet
 from enum import Enum
+import threading
 from app.llm.claude_client import ClaudeClient
 from app.llm.openai_client import OpenAIClient
 from app.config import settings
@@ -15,11 +16,39 @@ class LLMProvider(str, Enum):
     OPENAI = "openai"
 
 
+# Provider names (and members, which hash equal to their values) to members
+_PROVIDERS: Dict[str, LLMProvider] = {p.value: p for p in LLMProvider}
+
+
 class LLMFactory:
     """Factory for creating and managing LLM clients."""
 
-    _clients: Dict[str, Any] = {}
+    _claude: Optional[ClaudeClient] = None
+    _openai: Optional[OpenAIClient] = None
     _default_provider: LLMProvider = LLMProvider.CLAUDE
+    # Providers with configured API keys, resolved once on first access
+    _available: Optional[FrozenSet[str]] = None
+    # Guards lazy client construction; only taken while a slot is still empty
+    _init_lock = threading.Lock()
+
+    @classmethod
+    def _available_providers(cls) -> FrozenSet[str]:
+        """
+        Get the set of providers with configured API keys.
+
+        Returns:
+            Frozenset of available provider names
+        """
+        if cls._available is None:
+            cls._available = frozenset(
+                provider.value
+                for provider, key in (
+                    (LLMProvider.CLAUDE, settings.anthropic_api_key),
+                    (LLMProvider.OPENAI, settings.openai_api_key),
+                )
+                if key
+            )
+        return cls._available
 
     @classmethod
     def get_client(cls, provider: Optional[str] = None) -> Any:
@@ -32,21 +61,37 @@ class LLMFactory:
         Returns:
             LLM client instance
         """
-        provider = provider or cls._default_provider.value
-
-        if provider not in cls._clients:
-            if provider == LLMProvider.CLAUDE.value:
-                if not settings.anthropic_api_key:
-                    raise ValueError("Anthropic API key not configured")
-                cls._clients[provider] = ClaudeClient()
-            elif provider == LLMProvider.OPENAI.value:
-                if not settings.openai_api_key:
-                    raise ValueError("OpenAI API key not configured")
-                cls._clients[provider] = OpenAIClient()
-            else:
-                raise ValueError(f"Unknown LLM provider: {provider}")
-
-        return cls._clients[provider]
+        member = _PROVIDERS.get(provider) if provider else cls._default_provider
+
+        if member is LLMProvider.CLAUDE:
+            client = cls._claude
+            if client is None:
+                with cls._init_lock:
+                    if cls._claude is None:
+                        if LLMProvider.CLAUDE.value not in cls._available_providers():
+                            raise ValueError("Anthropic API key not configured")
+                        cls._claude = ClaudeClient()
+                    client = cls._claude
+            return client
+
+        if member is LLMProvider.OPENAI:
+            client = cls._openai
+            if client is None:
+                with cls._init_lock:
+                    if cls._openai is None:
+                        if LLMProvider.OPENAI.value not in cls._available_providers():
+                            raise ValueError("OpenAI API key not configured")
+                        cls._openai = OpenAIClient()
+                    client = cls._openai
+            return client
+
+        raise ValueError(f"Unknown LLM provider: {provider}")
+
+    @classmethod
+    def initialize(cls) -> None:
+        """Build clients for every configured provider ahead of the first request."""
+        for provider in cls.get_available_providers():
+            cls.get_client(provider)
 
     @classmethod
     def get_available_providers(cls) -> List[str]:
@@ -56,12 +101,9 @@ class LLMFactory:
         Returns:
             List of available provider names
         """
-        available = []
-        if settings.anthropic_api_key:
-            available.append(LLMProvider.CLAUDE.value)
-        if settings.openai_api_key:
-            available.append(LLMProvider.OPENAI.value)
-        return available
+        available = cls._available_providers()
+        # Keep the declared provider order for fallback selection
+        return [p.value for p in LLMProvider if p.value in available]
 
     @classmethod
     def get_fallback_client(cls) -> Any:
@@ -121,8 +163,9 @@ class LLMFactory:
         Args:
             provider: Provider name
         """
-        if provider not in [p.value for p in LLMProvider]:
+        member = _PROVIDERS.get(provider)
+        if member is None:
             raise ValueError(f"Invalid provider: {provider}")
-        cls._default_provider = LLMProvider(provider)
+        cls._default_provider = member
         logger.info(f"Set default LLM provider to: {provider}")
 
@@ -9,6 +9,9 @@ from app.utils.logger import logger
 class OpenAIClient:
     """Client for interacting with OpenAI API."""
 
+    # OpenAI caches long prompt prefixes automatically; no markers to send
+    supports_prompt_caching = False
+
     def __init__(self, api_key: Optional[str] = None):
         """
         Initialize OpenAI client.
@@ -22,6 +25,8 @@ class OpenAIClient:
 
         self.client = AsyncOpenAI(api_key=self.api_key)
         self.model = settings.openai_model
+        # Request fields that are fixed for the client's lifetime
+        self._base_params: Dict[str, Any] = {"model": self.model}
         logger.info(f"Initialized OpenAI client with model: {self.model}")
 
     async def chat(
@@ -32,7 +37,8 @@ class OpenAIClient:
         temperature: float = 0.7,
         functions: Optional[List[Dict[str, Any]]] = None,
         function_call: Optional[str] = None,
-        stream: bool = False
+        stream: bool = False,
+        slot_id: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Send chat completion request to OpenAI.
@@ -45,25 +51,29 @@ class OpenAIClient:
             functions: Optional list of function definitions
             function_call: Function calling mode
             stream: Whether to stream the response
+            slot_id: Upstream cache slot hint, sent as the X-LLM-Slot header
 
         Returns:
             Response dictionary with content and metadata
         """
         try:
-            # Prepare messages
-            chat_messages = messages.copy()
-            if system_prompt:
-                # Insert system message at the beginning
-                chat_messages.insert(0, {"role": "system", "content": system_prompt})
+            # Prepare messages, prepending the system message if given
+            chat_messages = (
+                [{"role": "system", "content": system_prompt}, *messages]
+                if system_prompt else messages
+            )
 
             # Prepare request parameters
             params: Dict[str, Any] = {
-                "model": self.model,
+                **self._base_params,
                 "messages": chat_messages,
                 "max_tokens": max_tokens,
                 "temperature": temperature,
             }
 
+            if slot_id is not None:
+                params["extra_headers"] = {"X-LLM-Slot": str(slot_id)}
+
             if functions:
                 params["tools"] = [{"type": "function", "function": func} for func in functions]
                 if function_call:
@@ -76,19 +86,23 @@ class OpenAIClient:
             response = await self.client.chat.completions.create(**params)
 
             # Extract content
-            content = response.choices[0].message.content or ""
-            tool_calls = []
+            message = response.choices[0].message
+            content = message.content or ""
 
-            if response.choices[0].message.tool_calls:
-                for tool_call in response.choices[0].message.tool_calls:
-                    tool_calls.append({
+            if message.tool_calls:
+                tool_calls = [
+                    {
                         "id": tool_call.id,
                         "type": tool_call.type,
                         "function": {
                             "name": tool_call.function.name,
                             "arguments": tool_call.function.arguments
                         }
-                    })
+                    }
+                    for tool_call in message.tool_calls
+                ]
+            else:
+                tool_calls = []
 
             result = {
                 "content": content,
@@ -102,7 +116,7 @@ class OpenAIClient:
                 "finish_reason": response.choices[0].finish_reason
             }
 
-            logger.debug(f"OpenAI response: {len(content)} chars, {result['usage']['output_tokens']} tokens")
+            logger.debug("OpenAI response: %d chars, %d tokens", len(content), result["usage"]["output_tokens"])
             return result
 
         except Exception as e:
@@ -130,7 +144,8 @@ class OpenAIClient:
         messages: List[Dict[str, str]],
         system_prompt: Optional[str] = None,
         max_tokens: int = 4096,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        slot_id: Optional[int] = None
     ) -> AsyncIterator[str]:
         """
         Stream chat response tokens.
@@ -140,27 +155,34 @@ class OpenAIClient:
             system_prompt: Optional system prompt
             max_tokens: Maximum tokens in response
             temperature: Sampling temperature
+            slot_id: Upstream cache slot hint, sent as the X-LLM-Slot header
 
         Yields:
             Text chunks from the stream
         """
         try:
-            chat_messages = messages.copy()
-            if system_prompt:
-                chat_messages.insert(0, {"role": "system", "content": system_prompt})
+            chat_messages = (
+                [{"role": "system", "content": system_prompt}, *messages]
+                if system_prompt else messages
+            )
 
-            params = {
-                "model": self.model,
+            params: Dict[str, Any] = {
+                **self._base_params,
                 "messages": chat_messages,
                 "max_tokens": max_tokens,
                 "temperature": temperature,
                 "stream": True
             }
 
+            if slot_id is not None:
+                params["extra_headers"] = {"X-LLM-Slot": str(slot_id)}
+
             stream = await self.client.chat.completions.create(**params)
             async for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
+                # Resolve the delta text once per chunk
+                text = chunk.choices[0].delta.content
+                if text:
+                    yield text
 
         except Exception as e:
             logger.error(f"Error in OpenAI stream: {str(e)}", exc_info=True)
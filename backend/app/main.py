@@ -1,12 +1,30 @@
 """Main FastAPI application."""
 
-from contextlib import asynccontextmanager
+import asyncio
+import orjson
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from app.config import settings
 from app.utils.logger import logger
 from app.api import routes, websocket
+from app.agents.voice_agent import VoiceAgent
+from app.llm.llm_factory import LLMFactory
+from app.rag.embeddings import EmbeddingGenerator
+
+
+def prewarm() -> None:
+    """Load the embedding model and connect the vector store ahead of the first request."""
+    try:
+        EmbeddingGenerator()
+    except Exception as e:
+        logger.warning(f"Embedding model warmup failed: {str(e)}")
+
+    try:
+        routes.get_vector_store()
+    except Exception as e:
+        logger.warning(f"Vector store warmup failed: {str(e)}")
 
 
 @asynccontextmanager
@@ -20,11 +38,26 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info(f"Starting {settings.app_name} in {settings.app_env} mode")
     logger.info(f"Log level: {settings.log_level}")
+    if settings.elevenlabs_api_key:
+        VoiceAgent.get_shared_tts_client()
+    try:
+        LLMFactory.initialize()
+    except Exception as e:
+        logger.warning(f"LLM client initialization failed: {str(e)}")
+
+    # Warm up in a worker thread so startup isn't blocked on model loading
+    app.state.warmup_task = asyncio.create_task(asyncio.to_thread(prewarm))
 
     yield
 
     # Shutdown
     logger.info("Shutting down application")
+    # A running warmup thread can't be interrupted, but its task must not outlive the app
+    app.state.warmup_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await app.state.warmup_task
+    await routes.close_clients()
+    await VoiceAgent.close_tts_client()
 
 
 # Create FastAPI app
@@ -32,9 +65,13 @@ app = FastAPI(
     title=settings.app_name,
     description="AI Agent System with Voice, RAG, and MCP",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Environment flag is fixed at startup; resolve it once for the error handler
+_IS_DEVELOPMENT = settings.is_development
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -59,11 +96,11 @@ async def global_exception_handler(request: Request, exc: Exception):
         JSON error response
     """
     logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
-            "detail": str(exc) if settings.is_development else "An error occurred"
+            "detail": str(exc) if _IS_DEVELOPMENT else "An error occurred"
         }
     )
 
@@ -73,6 +110,20 @@ app.include_router(routes.router, prefix="/api", tags=["API"])
 app.include_router(websocket.router, prefix="/api", tags=["WebSocket"])
 
 
+# Static payloads, serialized once since they only depend on startup settings
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "service": settings.app_name,
+    "version": "1.0.0"
+})
+_ROOT_BYTES = orjson.dumps({
+    "name": settings.app_name,
+    "version": "1.0.0",
+    "docs": "/docs",
+    "health": "/health"
+})
+
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -82,11 +133,7 @@ async def health_check():
     Returns:
         Health status
     """
-    return {
-        "status": "healthy",
-        "service": settings.app_name,
-        "version": "1.0.0"
-    }
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 
 # Root endpoint
@@ -98,12 +145,7 @@ async def root():
     Returns:
         API information
     """
-    return {
-        "name": settings.app_name,
-        "version": "1.0.0",
-        "docs": "/docs",
-        "health": "/health"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 """MCP server implementation."""
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+import orjson
 from app.mcp.tools import MCPToolRegistry
 from app.utils.logger import logger
 
@@ -13,6 +14,10 @@ class MCPServer:
         self.tool_registry = MCPToolRegistry()
         logger.info("Initialized MCP server")
 
+    async def aclose(self) -> None:
+        """Release resources held by the registered tools."""
+        await self.tool_registry.aclose()
+
     def get_tools(self) -> List[Dict[str, Any]]:
         """
         Get list of available tools.
@@ -22,6 +27,15 @@ class MCPServer:
         """
         return self.tool_registry.list_tools()
 
+    def get_tools_json(self) -> bytes:
+        """
+        Get the available tools as pre-serialized JSON.
+
+        Returns:
+            JSON-encoded list of tool schemas
+        """
+        return self.tool_registry.list_tools_json()
+
     async def execute_tool(
         self,
         tool_name: str,
@@ -54,7 +68,8 @@ class MCPServer:
         Returns:
             List of tool execution results
         """
-        results = []
+        # Parse all calls first, then run them concurrently
+        calls: List[Tuple[str, Dict[str, Any]]] = []
         for tool_call in tool_calls:
             tool_name = tool_call.get("name") or tool_call.get("function", {}).get("name")
             if not tool_name:
@@ -62,9 +77,8 @@ class MCPServer:
 
             # Extract parameters
             if "arguments" in tool_call:
-                import json
                 if isinstance(tool_call["arguments"], str):
-                    parameters = json.loads(tool_call["arguments"])
+                    parameters = orjson.loads(tool_call["arguments"])
                 else:
                     parameters = tool_call["arguments"]
             elif "input" in tool_call:
@@ -72,8 +86,7 @@ class MCPServer:
             else:
                 parameters = tool_call.get("parameters", {})
 
-            result = await self.execute_tool(tool_name, parameters)
-            results.append(result)
-
-        return results
+            calls.append((tool_name, parameters))
 
+        logger.info(f"Executing {len(calls)} MCP tools")
+        return await self.tool_registry.execute_tools(calls)
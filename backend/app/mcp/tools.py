@@ -1,12 +1,80 @@
 """MCP tool definitions and implementations."""
 
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
+from functools import lru_cache
+import ast
+import asyncio
+import time
 import json
+import operator
 import httpx
+import orjson
 import os
 from app.utils.logger import logger
 from app.utils.helpers import format_tool_output
 
+# Arithmetic operators the calculator accepts
+_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+# Cap exponents and integer result sizes so expressions like 9**9**9 or
+# ((9**999)**999)**999 are rejected before Python builds the huge integer
+_MAX_EXPONENT = 1000
+_MAX_INT_BITS = 4096
+
+
+@lru_cache(maxsize=512)
+def _parse_expression(expression: str) -> ast.Expression:
+    """
+    Parse an arithmetic expression, caching the tree for repeated expressions.
+
+    Args:
+        expression: Mathematical expression
+
+    Returns:
+        Parsed expression tree
+    """
+    return ast.parse(expression, mode="eval")
+
+
+def _evaluate(node: ast.AST) -> Union[int, float]:
+    """
+    Evaluate a parsed arithmetic expression, rejecting anything but numbers and operators.
+
+    Args:
+        node: Expression tree node
+
+    Returns:
+        Numeric result
+    """
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        left = _evaluate(node.left)
+        right = _evaluate(node.right)
+        if isinstance(node.op, ast.Pow) and abs(right) > _MAX_EXPONENT:
+            raise ValueError("Exponent too large")
+        if isinstance(left, int) and isinstance(right, int):
+            # Upper bounds on the result's bit length, checked before computing it
+            if isinstance(node.op, ast.Pow) and left.bit_length() * right > _MAX_INT_BITS:
+                raise ValueError("Result too large")
+            if isinstance(node.op, ast.Mult) and left.bit_length() + right.bit_length() > _MAX_INT_BITS:
+                raise ValueError("Result too large")
+        return _BINARY_OPS[type(node.op)](left, right)
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        return _UNARY_OPS[type(node.op)](_evaluate(node.operand))
+    raise ValueError("Unsupported expression")
+
 
 class MCPTool:
     """Base class for MCP tools."""
@@ -49,6 +117,9 @@ class MCPTool:
         """
         raise NotImplementedError("Subclasses must implement execute method")
 
+    async def aclose(self) -> None:
+        """Release resources held by the tool (no-op by default)."""
+
 
 class WebSearchTool(MCPTool):
     """Tool for web search (placeholder - requires search API)."""
@@ -141,16 +212,32 @@ class CalculatorTool(MCPTool):
             if not all(c in allowed_chars for c in expression):
                 raise ValueError("Invalid characters in expression")
 
-            result = eval(expression)
+            result = _evaluate(_parse_expression(expression).body)
             return format_tool_output(self.name, {"expression": expression, "result": result})
         except Exception as e:
             return format_tool_output(self.name, None, str(e))
 
 
+def _read_file_prefix(path: str, max_bytes: int) -> Tuple[bytes, int]:
+    """
+    Read up to max_bytes from a file.
+
+    Args:
+        path: File path
+        max_bytes: Maximum number of bytes to read
+
+    Returns:
+        Tuple of the bytes read and the full file size
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        return f.read(max_bytes), size
+
+
 class FileReadTool(MCPTool):
     """Tool for reading files."""
 
-    def __init__(self, base_path: str = "./data"):
+    def __init__(self, base_path: str = "./data", max_bytes: int = 1024 * 1024):
         super().__init__(
             name="file_read",
             description="Read contents of a file",
@@ -166,6 +253,9 @@ class FileReadTool(MCPTool):
             }
         )
         self.base_path = base_path
+        self.max_bytes = max_bytes
+        # Normalized once; the trailing separator stops sibling-prefix matches like ./data2
+        self._base_abspath = os.path.join(os.path.abspath(base_path), "")
 
     async def execute(self, file_path: str) -> Dict[str, Any]:
         """
@@ -179,19 +269,24 @@ class FileReadTool(MCPTool):
         """
         try:
             # Security: prevent path traversal
-            full_path = os.path.join(self.base_path, file_path)
-            if not os.path.abspath(full_path).startswith(os.path.abspath(self.base_path)):
+            full_path = os.path.abspath(os.path.join(self._base_abspath, file_path))
+            if not full_path.startswith(self._base_abspath):
                 raise ValueError("Invalid file path")
 
-            with open(full_path, "r", encoding="utf-8") as f:
-                content = f.read()
+            # Read off the event loop; cap the read so huge files can't exhaust memory
+            data, file_size = await asyncio.to_thread(_read_file_prefix, full_path, self.max_bytes)
+            truncated = file_size > len(data)
+            # A cut can land mid-character, so only a truncated read tolerates a partial tail
+            content = data.decode("utf-8", errors="ignore" if truncated else "strict")
 
             return format_tool_output(
                 self.name,
                 {
                     "file_path": file_path,
                     "content": content,
-                    "size": len(content)
+                    "size": len(content),
+                    "file_size": file_size,
+                    "content_truncated": truncated
                 }
             )
         except Exception as e:
@@ -201,7 +296,7 @@ class FileReadTool(MCPTool):
 class APICallTool(MCPTool):
     """Tool for making HTTP API calls."""
 
-    def __init__(self):
+    def __init__(self, cache_ttl: float = 60.0, cache_size: int = 256):
         super().__init__(
             name="api_call",
             description="Make HTTP API call",
@@ -229,6 +324,27 @@ class APICallTool(MCPTool):
                 "required": ["url"]
             }
         )
+        # Pooled client reused across calls so connections are kept alive
+        self._client: Optional[httpx.AsyncClient] = None
+        # Short-lived cache of successful GET results: key -> (expiry, result)
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._get_cache: "OrderedDict[Tuple[str, Tuple[Tuple[str, str], ...]], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get or create the pooled HTTP client."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=10.0,
+                limits=httpx.Limits(max_keepalive_connections=64, max_connections=128)
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def execute(
         self,
@@ -250,24 +366,52 @@ class APICallTool(MCPTool):
             API response
         """
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    headers=headers or {},
-                    json=body
-                )
-                response.raise_for_status()
-
-                return format_tool_output(
-                    self.name,
-                    {
-                        "url": url,
-                        "method": method,
-                        "status_code": response.status_code,
-                        "response": response.json() if response.headers.get("content-type", "").startswith("application/json") else response.text
-                    }
-                )
+            # Idempotent GETs without a body can be answered from the short-lived cache
+            cache_key = None
+            if method == "GET" and body is None and self.cache_ttl > 0:
+                cache_key = (url, tuple(sorted((headers or {}).items())))
+                cached = self._get_cache.get(cache_key)
+                if cached is not None:
+                    if cached[0] > time.monotonic():
+                        self._get_cache.move_to_end(cache_key)
+                        return format_tool_output(self.name, cached[1])
+                    del self._get_cache[cache_key]
+
+            if body is not None:
+                # Encode with orjson; caller headers may still override the content type
+                content = orjson.dumps(body)
+                headers = {"content-type": "application/json", **(headers or {})}
+            else:
+                content = None
+
+            response = await self._get_client().request(
+                method=method,
+                url=url,
+                headers=headers or {},
+                content=content
+            )
+            response.raise_for_status()
+
+            if response.headers.get("content-type", "").startswith("application/json"):
+                payload = orjson.loads(response.content)
+            else:
+                payload = response.text
+
+            result = {
+                "url": url,
+                "method": method,
+                "status_code": response.status_code,
+                "response": payload
+            }
+
+            cache_control = response.headers.get("cache-control", "").lower()
+            if cache_key is not None and "no-store" not in cache_control and "no-cache" not in cache_control:
+                self._get_cache[cache_key] = (time.monotonic() + self.cache_ttl, result)
+                self._get_cache.move_to_end(cache_key)
+                if len(self._get_cache) > self.cache_size:
+                    self._get_cache.popitem(last=False)
+
+            return format_tool_output(self.name, result)
         except Exception as e:
             return format_tool_output(self.name, None, str(e))
 
@@ -322,8 +466,25 @@ class MCPToolRegistry:
     def __init__(self):
         """Initialize tool registry."""
         self.tools: Dict[str, MCPTool] = {}
+        # Schemas are built once at registration; the JSON form is memoized on demand
+        self._schemas: Dict[str, Dict[str, Any]] = {}
+        self._schemas_json: Optional[bytes] = None
         self._register_default_tools()
 
+    async def __aenter__(self) -> "MCPToolRegistry":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Release resources held by registered tools."""
+        for tool in self.tools.values():
+            try:
+                await tool.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing MCP tool {tool.name}: {str(e)}")
+
     def _register_default_tools(self):
         """Register default tools."""
         self.register(WebSearchTool())
@@ -340,6 +501,8 @@ class MCPToolRegistry:
             tool: Tool instance
         """
         self.tools[tool.name] = tool
+        self._schemas[tool.name] = tool.get_schema()
+        self._schemas_json = None
         logger.info(f"Registered MCP tool: {tool.name}")
 
     def get_tool(self, name: str) -> Optional[MCPTool]:
@@ -361,7 +524,18 @@ class MCPToolRegistry:
         Returns:
             List of tool schemas
         """
-        return [tool.get_schema() for tool in self.tools.values()]
+        return list(self._schemas.values())
+
+    def list_tools_json(self) -> bytes:
+        """
+        List all registered tools as pre-serialized JSON.
+
+        Returns:
+            JSON-encoded list of tool schemas
+        """
+        if self._schemas_json is None:
+            self._schemas_json = orjson.dumps(list(self._schemas.values()))
+        return self._schemas_json
 
     async def execute_tool(self, name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -384,3 +558,33 @@ class MCPToolRegistry:
             logger.error(f"Error executing tool {name}: {str(e)}", exc_info=True)
             return format_tool_output(name, None, str(e))
 
+    async def execute_tools(
+        self,
+        calls: List[Tuple[str, Dict[str, Any]]],
+        max_concurrency: int = 8
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute several tools concurrently.
+
+        Args:
+            calls: List of (tool name, parameters) pairs
+            max_concurrency: Maximum number of tools running at once
+
+        Returns:
+            Tool execution results, in call order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.execute_tool(name, parameters)
+
+        results = await asyncio.gather(
+            *(run(name, parameters) for name, parameters in calls),
+            return_exceptions=True
+        )
+        return [
+            format_tool_output(name, None, str(result)) if isinstance(result, Exception) else result
+            for (name, _), result in zip(calls, results)
+        ]
+
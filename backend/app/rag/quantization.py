@@ -0,0 +1,50 @@
+"""Symmetric int8 quantization for embedding vectors."""
+
+from typing import Tuple
+import numpy as np
+
+# Largest int8 magnitude used by the symmetric scheme
+INT8_MAX = 127
+
+
+def quantize_int8(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize embeddings to int8 with one scale per vector.
+
+    Each row is scaled so its largest absolute component maps to 127;
+    ``q * scale / 127`` recovers the original values.
+
+    Args:
+        embeddings: 2D float array, one embedding per row
+
+    Returns:
+        Tuple of int8 array and float32 per-row scales (max absolute value)
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    scales = np.abs(embeddings).max(axis=1)
+    safe = np.where(scales > 0, scales, 1.0)
+    quantized = np.rint(embeddings * (INT8_MAX / safe)[:, None]).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+def int8_similarity(
+    quantized: np.ndarray,
+    scales: np.ndarray,
+    query: np.ndarray,
+    query_scale: float
+) -> np.ndarray:
+    """
+    Approximate dot products between int8 embeddings and an int8 query.
+
+    Args:
+        quantized: 2D int8 array of stored embeddings
+        scales: Per-row scales of the stored embeddings
+        query: 1D int8 query embedding
+        query_scale: Scale of the query embedding
+
+    Returns:
+        Float32 array of approximate dot products, one per stored row
+    """
+    # Accumulate in int32 so the products can't overflow int8
+    dots = quantized.astype(np.int32) @ query.astype(np.int32)
+    return (dots * scales * (query_scale / (INT8_MAX * INT8_MAX))).astype(np.float32)
@@ -1,10 +1,22 @@
 """RAG retriever with query processing and re-ranking."""
 
 from typing import List, Dict, Any, Optional
-from app.rag.vectorstore import VectorStore
+import io
+import re
+import numpy as np
+from app.rag.vectorstore import RetrievalResult, VectorStore
 from app.utils.logger import logger
 from app.utils.helpers import sanitize_input
 
+# Runs of whitespace collapsed to a single space in queries
+_WHITESPACE_RE = re.compile(r"\s+")
+# Queries are truncated to this many characters
+_MAX_QUERY_LENGTH = 1000
+
+# Divisor turning a Chroma distance into 1 - cosine similarity for unit-length
+# embeddings: squared L2 is 2 - 2cos, inner-product and cosine distance are 1 - cos
+_DISTANCE_SCALE = {"l2": 2.0, "ip": 1.0, "cosine": 1.0}
+
 
 class RAGRetriever:
     """Retriever for RAG with query preprocessing and context management."""
@@ -29,11 +41,13 @@ class RAGRetriever:
         Returns:
             Preprocessed query
         """
-        # Sanitize input
-        query = sanitize_input(query, max_length=1000)
+        # Sanitize input; short queries without NUL bytes only need trimming,
+        # which the whitespace pass below covers
+        if len(query) > _MAX_QUERY_LENGTH or "\x00" in query:
+            query = sanitize_input(query, max_length=_MAX_QUERY_LENGTH)
 
-        # Remove extra whitespace
-        query = " ".join(query.split())
+        # Collapse runs of whitespace and trim the ends
+        query = _WHITESPACE_RE.sub(" ", query).strip()
 
         # Convert to lowercase for better matching (optional)
         # query = query.lower()
@@ -46,7 +60,7 @@ class RAGRetriever:
         top_k: Optional[int] = None,
         filter_metadata: Optional[Dict[str, Any]] = None,
         min_score: Optional[float] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[RetrievalResult]:
         """
         Retrieve relevant documents for a query.
 
@@ -59,32 +73,67 @@ class RAGRetriever:
         Returns:
             List of retrieved documents with scores
         """
-        # Preprocess query
-        processed_query = self.preprocess_query(query)
+        return self.retrieve_many(
+            [query],
+            top_k=top_k,
+            filter_metadata=filter_metadata,
+            min_score=min_score
+        )[0]
+
+    def retrieve_many(
+        self,
+        queries: List[str],
+        top_k: Optional[int] = None,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        min_score: Optional[float] = None
+    ) -> List[List[RetrievalResult]]:
+        """
+        Retrieve relevant documents for several queries in one batch.
+
+        Args:
+            queries: Search queries
+            top_k: Number of results to return per query
+            filter_metadata: Optional metadata filter
+            min_score: Minimum similarity score threshold
+
+        Returns:
+            One list of retrieved documents with scores per query
+        """
+        # Preprocess queries
+        processed_queries = [self.preprocess_query(query) for query in queries]
 
         # Search vector store
-        results = self.vector_store.search(
-            query=processed_query,
+        batches = self.vector_store.search_many(
+            queries=processed_queries,
             top_k=top_k,
             filter_metadata=filter_metadata
         )
 
-        # Convert distance to similarity score (ChromaDB uses distance, lower is better)
-        for result in results:
-            if result["distance"] is not None:
-                # Convert distance to similarity (1 - normalized distance)
-                # Assuming max distance is around 2.0 for cosine distance
-                similarity = max(0.0, 1.0 - (result["distance"] / 2.0))
-                result["score"] = similarity
-            else:
-                result["score"] = 1.0
+        distance_scale = _DISTANCE_SCALE.get(self.vector_store.distance_metric, 2.0)
+
+        retrieved = []
+        for query, results in zip(queries, batches):
+            if results:
+                # Convert distance to similarity score (ChromaDB uses distance, lower is better):
+                # the cosine similarity, clipped at 0. Results without a distance score 1.0.
+                distances = np.array(
+                    [np.nan if r.distance is None else r.distance for r in results],
+                    dtype=np.float64
+                )
+                scores = np.where(
+                    np.isnan(distances), 1.0, np.maximum(0.0, 1.0 - distances / distance_scale)
+                )
+                for result, score in zip(results, scores.tolist()):
+                    result.score = score
 
-        # Filter by minimum score
-        if min_score is not None:
-            results = [r for r in results if r.get("score", 0) >= min_score]
+                # Filter by minimum score
+                if min_score is not None:
+                    results = [results[i] for i in np.flatnonzero(scores >= min_score).tolist()]
 
-        logger.debug(f"Retrieved {len(results)} documents for query: {query[:50]}...")
-        return results
+            logger.debug(f"Retrieved {len(results)} documents for query: {query[:50]}...")
+            retrieved.append(results)
+
+        return retrieved
 
     def retrieve_with_context(
         self,
@@ -108,27 +157,30 @@ class RAGRetriever:
         # Retrieve documents
         results = self.retrieve(query, top_k=top_k, filter_metadata=filter_metadata)
 
-        # Build context string
-        context_parts = []
+        # Build context string in one buffer, counting separators toward the budget
+        buffer = io.StringIO()
         sources = []
         current_length = 0
+        separator = "\n\n"
 
         for result in results:
-            doc_text = result["document"]
-            doc_length = len(doc_text)
+            doc_text = result.document
+            added_length = len(doc_text) + (len(separator) if sources else 0)
 
-            if current_length + doc_length > max_context_length:
+            if current_length + added_length > max_context_length:
                 break
 
-            context_parts.append(doc_text)
+            if sources:
+                buffer.write(separator)
+            buffer.write(doc_text)
             sources.append({
-                "id": result["id"],
-                "metadata": result.get("metadata", {}),
-                "score": result.get("score", 0)
+                "id": result.id,
+                "metadata": result.metadata or {},
+                "score": result.score
             })
-            current_length += doc_length
+            current_length += added_length
 
-        context = "\n\n".join(context_parts)
+        context = buffer.getvalue()
 
         return {
             "context": context,
@@ -140,9 +192,9 @@ class RAGRetriever:
     def rerank_results(
         self,
         query: str,
-        results: List[Dict[str, Any]],
+        results: List[RetrievalResult],
         top_k: Optional[int] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[RetrievalResult]:
         """
         Re-rank search results (simple implementation using existing scores).
 
@@ -154,13 +206,21 @@ class RAGRetriever:
         Returns:
             Re-ranked results
         """
-        # Sort by score (descending)
-        sorted_results = sorted(results, key=lambda x: x.get("score", 0), reverse=True)
+        if not results:
+            return []
 
-        if top_k:
-            sorted_results = sorted_results[:top_k]
+        # Sort by score (descending), keeping the original order for ties
+        neg_scores = -np.fromiter(
+            (r.score for r in results), dtype=np.float64, count=len(results)
+        )
+        if top_k and top_k < len(results):
+            # Partition out the top k in O(n), then sort only those
+            top = np.sort(np.argpartition(neg_scores, top_k - 1)[:top_k])
+            order = top[np.argsort(neg_scores[top], kind="stable")]
+        else:
+            order = np.argsort(neg_scores, kind="stable")
 
-        return sorted_results
+        return [results[i] for i in order.tolist()]
 
     def format_context_for_llm(
         self,
@@ -183,17 +243,15 @@ class RAGRetriever:
         if not context:
             return "No relevant context found."
 
-        formatted = f"Relevant Context:\n\n{context}"
+        if not (include_sources and sources):
+            return f"Relevant Context:\n\n{context}"
 
-        if include_sources and sources:
-            formatted += "\n\nSources:\n"
-            for i, source in enumerate(sources, 1):
-                source_id = source.get("id", "unknown")
-                metadata = source.get("metadata", {})
-                formatted += f"{i}. Document ID: {source_id}"
-                if metadata.get("title"):
-                    formatted += f" - {metadata['title']}"
-                formatted += "\n"
+        # Build each source line once and join, instead of repeated concatenation
+        lines = []
+        for i, source in enumerate(sources, 1):
+            title = source.get("metadata", {}).get("title")
+            suffix = f" - {title}" if title else ""
+            lines.append(f"{i}. Document ID: {source.get('id', 'unknown')}{suffix}\n")
 
-        return formatted
+        return f"Relevant Context:\n\n{context}\n\nSources:\n{''.join(lines)}"
 
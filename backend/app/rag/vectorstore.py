@@ -1,21 +1,83 @@
 """Vector store implementation using ChromaDB."""
 
-from typing import List, Dict, Any, Optional
+import asyncio
+from dataclasses import asdict, dataclass
+from typing import List, Dict, Any, Optional, Tuple
+import itertools
+import json
+import time
+import numpy as np
 import chromadb
 from chromadb.config import Settings as ChromaSettings
+from app.cache.semantic_cache import SemanticCache
 from app.config import settings
 from app.rag.embeddings import EmbeddingGenerator
 from app.utils.logger import logger
-from app.utils.helpers import chunk_text
+from app.utils.helpers import chunk_offsets, chunk_text_iter
+
+
+@dataclass(slots=True)
+class RetrievalResult:
+    """A single search hit; slotted to keep per-result overhead low in ranking loops."""
+
+    id: str
+    document: str
+    metadata: Dict[str, Any]
+    distance: Optional[float]
+    score: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Convert to a plain dictionary for API responses.
+
+        Returns:
+            Result dictionary
+        """
+        return asdict(self)
+
+
+def _build_where(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Translate a metadata filter into a Chroma where clause.
+
+    Plain ``{"field": value}`` pairs become ``$eq`` conditions and list values
+    become ``$in``; several fields are combined with ``$and``, which Chroma
+    requires for multi-field filters. Values that are already operator dicts
+    and top-level ``$and``/``$or`` clauses are passed through, so filtering
+    always runs server-side against the metadata index.
+
+    Args:
+        filters: Metadata filter, or None
+
+    Returns:
+        Chroma where clause, or None when there is nothing to filter on
+    """
+    if not filters:
+        return None
+
+    conditions = []
+    for field, value in filters.items():
+        if field.startswith("$") or isinstance(value, dict):
+            conditions.append({field: value})
+        elif isinstance(value, (list, tuple, set)):
+            conditions.append({field: {"$in": list(value)}})
+        else:
+            conditions.append({field: {"$eq": value}})
+
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
 
 
 class VectorStore:
     """Vector store for document embeddings using ChromaDB."""
 
+    # Seconds a collection count is reused by get_collection_stats
+    count_cache_ttl: float = 5.0
+
     def __init__(
         self,
         collection_name: Optional[str] = None,
-        embedding_generator: Optional[EmbeddingGenerator] = None
+        embedding_generator: Optional[EmbeddingGenerator] = None,
+        search_cache: Optional[SemanticCache] = None
     ):
         """
         Initialize vector store.
@@ -23,9 +85,13 @@ class VectorStore:
         Args:
             collection_name: Name of the ChromaDB collection
             embedding_generator: Optional embedding generator instance
+            search_cache: Optional cache returning stored hits for near-duplicate queries
         """
         self.collection_name = collection_name or settings.chroma_collection_name
         self.embedding_generator = embedding_generator or EmbeddingGenerator()
+        self.search_cache = search_cache
+        # (expiry, count) from the last count() round-trip; dropped on writes
+        self._count_cache: Optional[Tuple[float, int]] = None
 
         # Initialize ChromaDB client
         try:
@@ -41,21 +107,32 @@ class VectorStore:
 
         # Get or create collection
         self.collection = self._get_or_create_collection()
+        # Existing collections keep the metric they were created with (Chroma defaults to l2)
+        collection_metadata = self.collection.metadata or {}
+        self.distance_metric = collection_metadata.get("hnsw:space", "l2")
+        # Queries must be truncated the same way as the stored documents
+        stored_dim = collection_metadata.get("embedding_dim")
+        if stored_dim != self.embedding_generator.dim:
+            logger.warning(
+                f"Collection {self.collection_name} holds embeddings truncated to "
+                f"{stored_dim or 'the full dimension'}, but the generator uses "
+                f"{self.embedding_generator.dim or 'the full dimension'}"
+            )
 
     def _get_or_create_collection(self):
         """Get existing collection or create new one."""
-        try:
-            collection = self.client.get_collection(name=self.collection_name)
-            logger.info(f"Retrieved existing collection: {self.collection_name}")
-            return collection
-        except Exception:
-            # Collection doesn't exist, create it
-            collection = self.client.create_collection(
-                name=self.collection_name,
-                metadata={"description": "AI Agent System Document Store"}
-            )
-            logger.info(f"Created new collection: {self.collection_name}")
-            return collection
+        # One server-side call; metadata only applies when the collection is
+        # created. Embeddings are unit-length, so an inner-product index ranks
+        # by cosine similarity directly.
+        metadata = {"description": "AI Agent System Document Store", "hnsw:space": "ip"}
+        if self.embedding_generator.dim is not None:
+            metadata["embedding_dim"] = self.embedding_generator.dim
+        collection = self.client.get_or_create_collection(
+            name=self.collection_name,
+            metadata=metadata
+        )
+        logger.info(f"Using collection: {self.collection_name}")
+        return collection
 
     def add_document(
         self,
@@ -81,17 +158,17 @@ class VectorStore:
         if not document_id:
             document_id = self.embedding_generator.generate_document_id(text, metadata)
 
-        # Prepare metadata
-        doc_metadata = metadata or {}
-        doc_metadata["text_length"] = len(text)
+        # Prepare metadata (a copy, so the caller's dict is left untouched)
+        doc_metadata = {**(metadata or {}), "text_length": len(text)}
 
         # Add to collection
         self.collection.add(
             ids=[document_id],
-            embeddings=[embedding],
+            embeddings=[embedding.tolist()],
             documents=[text],
             metadatas=[doc_metadata]
         )
+        self._invalidate_caches()
 
         logger.debug(f"Added document {document_id} to vector store")
         return document_id
@@ -115,7 +192,68 @@ class VectorStore:
         """
         # Generate embeddings in batch
         embeddings = self.embedding_generator.generate_batch(texts)
+        document_ids, metadatas = self._prepare_rows(texts, document_ids, metadatas)
+
+        # Add to collection in bounded batches; one huge add stalls the client
+        # and the server-side insert transaction grows with the payload
+        batch_size = max(1, settings.chroma_batch_size)
+        for start in range(0, len(texts), batch_size):
+            end = start + batch_size
+            self._insert_batch(
+                document_ids[start:end], texts[start:end], embeddings[start:end], metadatas[start:end]
+            )
+        self._invalidate_caches()
+
+        logger.info(f"Added {len(texts)} documents to vector store")
+        return document_ids
+
+    async def add_documents_async(
+        self,
+        texts: List[str],
+        document_ids: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ) -> List[str]:
+        """
+        Add multiple documents, overlapping embedding with insertion.
+
+        Each batch is embedded on a worker thread while the previous batch is
+        written to Chroma on another, so model compute and storage I/O run
+        concurrently instead of back to back.
+
+        Args:
+            texts: List of document texts
+            document_ids: Optional list of document IDs
+            metadatas: Optional list of metadata dictionaries
 
+        Returns:
+            List of document IDs
+        """
+        document_ids, metadatas = self._prepare_rows(texts, document_ids, metadatas)
+
+        batch_size = max(1, settings.chroma_batch_size)
+        pending = None
+        for start in range(0, len(texts), batch_size):
+            end = start + batch_size
+            embed = asyncio.to_thread(self.embedding_generator.generate_batch, texts[start:end])
+            if pending is None:
+                embeddings = await embed
+            else:
+                embeddings, _ = await asyncio.gather(embed, asyncio.to_thread(self._insert_batch, *pending))
+            pending = (document_ids[start:end], texts[start:end], embeddings, metadatas[start:end])
+        if pending is not None:
+            await asyncio.to_thread(self._insert_batch, *pending)
+        self._invalidate_caches()
+
+        logger.info(f"Added {len(texts)} documents to vector store")
+        return document_ids
+
+    def _prepare_rows(
+        self,
+        texts: List[str],
+        document_ids: Optional[List[str]],
+        metadatas: Optional[List[Dict[str, Any]]]
+    ) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Fill in missing document IDs and build the stored metadata for each text."""
         # Generate IDs if not provided
         if not document_ids:
             document_ids = [
@@ -123,24 +261,28 @@ class VectorStore:
                 for text, metadata in zip(texts, metadatas or [None] * len(texts))
             ]
 
-        # Prepare metadatas
-        if not metadatas:
-            metadatas = [{"text_length": len(text)} for text in texts]
-        else:
-            for i, metadata in enumerate(metadatas):
-                metadata["text_length"] = len(texts[i])
+        # Prepare metadatas as new dicts rather than mutating the caller's
+        metadatas = [
+            {**(metadata or {}), "text_length": text_length}
+            for metadata, text_length in zip(metadatas or [None] * len(texts), map(len, texts))
+        ]
+        return document_ids, metadatas
 
-        # Add to collection
+    def _insert_batch(
+        self,
+        document_ids: List[str],
+        texts: List[str],
+        embeddings: np.ndarray,
+        metadatas: List[Dict[str, Any]]
+    ) -> None:
+        """Write one batch of embedded documents to the collection."""
         self.collection.add(
             ids=document_ids,
-            embeddings=embeddings,
+            embeddings=embeddings.tolist(),
             documents=texts,
             metadatas=metadatas
         )
 
-        logger.info(f"Added {len(texts)} documents to vector store")
-        return document_ids
-
     def add_document_chunked(
         self,
         text: str,
@@ -163,35 +305,44 @@ class VectorStore:
             List of chunk IDs
         """
         chunk_size = chunk_size or settings.rag_chunk_size
-        chunk_overlap = chunk_overlap or settings.rag_chunk_overlap
+        # An explicit overlap of 0 is valid, so only fall back when it's omitted
+        if chunk_overlap is None:
+            chunk_overlap = settings.rag_chunk_overlap
 
-        # Split into chunks
-        chunks = chunk_text(text, chunk_size, chunk_overlap)
+        # Chunk lazily and insert batch by batch, so only one batch of chunk
+        # strings is alive at a time instead of a copy of the whole document
+        total_chunks = len(chunk_offsets(len(text), chunk_size, chunk_overlap))
+        chunks = chunk_text_iter(text, chunk_size, chunk_overlap)
 
         # Generate chunk IDs
         base_id = document_id or self.embedding_generator.generate_document_id(text, metadata)
-        chunk_ids = [f"{base_id}_chunk_{i}" for i in range(len(chunks))]
-
-        # Prepare metadata for each chunk
-        chunk_metadatas = []
-        for i, chunk in enumerate(chunks):
-            chunk_meta = (metadata or {}).copy()
-            chunk_meta.update({
-                "chunk_index": i,
-                "total_chunks": len(chunks),
-                "base_document_id": base_id
-            })
-            chunk_metadatas.append(chunk_meta)
-
-        # Add chunks
-        return self.add_documents(chunks, chunk_ids, chunk_metadatas)
+
+        # Metadata shared by every chunk; each chunk only adds its index
+        base_metadata = {
+            **(metadata or {}),
+            "total_chunks": total_chunks,
+            "base_document_id": base_id
+        }
+
+        chunk_ids = []
+        batch_size = max(1, settings.chroma_batch_size)
+        for batch_start in range(0, total_chunks, batch_size):
+            batch = list(itertools.islice(chunks, batch_size))
+            indices = range(batch_start, batch_start + len(batch))
+            batch_ids = [f"{base_id}_chunk_{i}" for i in indices]
+            batch_metadatas = [{**base_metadata, "chunk_index": i} for i in indices]
+
+            # Add chunks
+            chunk_ids.extend(self.add_documents(batch, batch_ids, batch_metadatas))
+
+        return chunk_ids
 
     def search(
         self,
         query: str,
         top_k: Optional[int] = None,
         filter_metadata: Optional[Dict[str, Any]] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[RetrievalResult]:
         """
         Search for similar documents.
 
@@ -203,30 +354,87 @@ class VectorStore:
         Returns:
             List of search results with documents, metadata, and distances
         """
+        return self.search_many([query], top_k=top_k, filter_metadata=filter_metadata)[0]
+
+    def search_many(
+        self,
+        queries: List[str],
+        top_k: Optional[int] = None,
+        filter_metadata: Optional[Dict[str, Any]] = None
+    ) -> List[List[RetrievalResult]]:
+        """
+        Search for several queries with one batched embedding pass and one query call.
+
+        Args:
+            queries: Search query texts
+            top_k: Number of results to return per query
+            filter_metadata: Optional metadata filter applied to every query
+
+        Returns:
+            One list of search results per query, in query order
+        """
+        if not queries:
+            return []
+
         top_k = top_k or settings.rag_top_k
 
-        # Generate query embedding
-        query_embedding = self.embedding_generator.generate(query)
+        # Embed every query in one batched forward pass; the cache lookups
+        # and the Chroma query for the misses all reuse these vectors
+        query_embeddings = self.embedding_generator.generate_batch(queries)
+
+        if self.search_cache is None:
+            return self._query_embeddings(query_embeddings, top_k, filter_metadata)
+
+        # Serve near-duplicate queries from the cache and only search the misses
+        cache_key = f"search:{top_k}"
+        cache_context = json.dumps(filter_metadata, sort_keys=True, default=str)
+        formatted_results: List[Optional[List[RetrievalResult]]] = []
+        misses = []
+        for i, query in enumerate(queries):
+            cached = self.search_cache.lookup(cache_key, cache_context, query, embedding=query_embeddings[i])
+            formatted_results.append(list(cached["results"]) if cached is not None else None)
+            if cached is None:
+                misses.append(i)
+
+        if misses:
+            fresh = self._query_embeddings(query_embeddings[misses], top_k, filter_metadata)
+            for i, results in zip(misses, fresh):
+                self.search_cache.store(
+                    cache_key, cache_context, queries[i], {"results": results}, embedding=query_embeddings[i]
+                )
+                formatted_results[i] = list(results)
+
+        return formatted_results
 
+    def _query_embeddings(
+        self,
+        query_embeddings: np.ndarray,
+        top_k: int,
+        filter_metadata: Optional[Dict[str, Any]]
+    ) -> List[List[RetrievalResult]]:
+        """Run a single collection query for a batch of query embeddings."""
         # Perform search
         results = self.collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=query_embeddings.tolist(),
             n_results=top_k,
-            where=filter_metadata
+            where=_build_where(filter_metadata)
         )
 
-        # Format results
-        formatted_results = []
-        if results["ids"] and len(results["ids"][0]) > 0:
-            for i in range(len(results["ids"][0])):
-                formatted_results.append({
-                    "id": results["ids"][0][i],
-                    "document": results["documents"][0][i],
-                    "metadata": results["metadatas"][0][i],
-                    "distance": results["distances"][0][i] if "distances" in results else None
-                })
-
-        logger.debug(f"Found {len(formatted_results)} results for query")
+        # Format results, pulling each column out of the response once
+        if not results["ids"]:
+            return [[] for _ in range(len(query_embeddings))]
+        distances = results.get("distances") or [[None] * len(ids) for ids in results["ids"]]
+        formatted_results = [
+            [
+                RetrievalResult(id=doc_id, document=document, metadata=metadata, distance=distance)
+                for doc_id, document, metadata, distance in zip(ids, documents, metadatas, dists)
+            ]
+            for ids, documents, metadatas, dists in zip(
+                results["ids"], results["documents"], results["metadatas"], distances
+            )
+        ]
+
+        logger.debug(f"Found {sum(map(len, formatted_results))} results for {len(query_embeddings)} queries")
         return formatted_results
 
     def delete_document(self, document_id: str) -> None:
@@ -237,8 +445,15 @@ class VectorStore:
             document_id: Document ID to delete
         """
         self.collection.delete(ids=[document_id])
+        self._invalidate_caches()
         logger.info(f"Deleted document {document_id}")
 
+    def _invalidate_caches(self) -> None:
+        """Drop cached search hits and counts after the collection changes."""
+        self._count_cache = None
+        if self.search_cache is not None:
+            self.search_cache.clear()
+
     def get_document(self, document_id: str) -> Optional[Dict[str, Any]]:
         """
         Get a document by ID.
@@ -265,7 +480,12 @@ class VectorStore:
         Returns:
             Dictionary with collection statistics
         """
-        count = self.collection.count()
+        now = time.monotonic()
+        if self._count_cache is not None and self._count_cache[0] > now:
+            count = self._count_cache[1]
+        else:
+            count = self.collection.count()
+            self._count_cache = (now + self.count_cache_ttl, count)
         return {
             "collection_name": self.collection_name,
             "document_count": count,
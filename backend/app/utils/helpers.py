@@ -1,10 +1,16 @@
 """Helper utility functions."""
 
-import hashlib
+import itertools
 import json
-from typing import Any, Dict, List, Optional
+import secrets
+from typing import Any, Dict, Iterator, List, Optional
 from datetime import datetime
 
+# Message IDs are a per-process random prefix plus a counter: unique within
+# the process (unlike hashing a timestamp) and with no hashing per call
+_MESSAGE_ID_PREFIX = secrets.token_hex(4)
+_message_counter = itertools.count()
+
 
 def calculate_token_estimate(text: str) -> int:
     """
@@ -16,7 +22,8 @@ def calculate_token_estimate(text: str) -> int:
     Returns:
         Estimated token count
     """
-    # Rough estimate: 1 token ≈ 4 characters
+    # Rough estimate: 1 token ≈ 4 characters. len() on str is O(1), so this
+    # stays cheap even for long RAG-injected prompts; don't scan the text here.
     return len(text) // 4
 
 
@@ -41,9 +48,43 @@ def generate_message_id() -> str:
     Returns:
         Unique message ID string
     """
-    timestamp = datetime.now().isoformat()
-    hash_obj = hashlib.md5(timestamp.encode())
-    return hash_obj.hexdigest()[:16]
+    return f"{_MESSAGE_ID_PREFIX}{next(_message_counter):08x}"
+
+
+def chunk_offsets(text_length: int, chunk_size: int, overlap: int = 0) -> range:
+    """
+    Compute the start offset of every chunk.
+
+    Args:
+        text_length: Length of the text to chunk
+        chunk_size: Maximum size of each chunk
+        overlap: Number of characters to overlap between chunks
+
+    Returns:
+        Range of chunk start offsets
+    """
+    if text_length <= chunk_size:
+        return range(1)
+
+    # Clamp the step so overlap >= chunk_size cannot stall
+    step = max(1, chunk_size - overlap)
+    return range(0, text_length, step)
+
+
+def chunk_text_iter(text: str, chunk_size: int, overlap: int = 0) -> Iterator[str]:
+    """
+    Lazily split text into overlapping chunks.
+
+    Args:
+        text: Input text to chunk
+        chunk_size: Maximum size of each chunk
+        overlap: Number of characters to overlap between chunks
+
+    Yields:
+        Text chunks, in order
+    """
+    for start in chunk_offsets(len(text), chunk_size, overlap):
+        yield text[start:start + chunk_size]
 
 
 def chunk_text(text: str, chunk_size: int, overlap: int = 0) -> List[str]:
@@ -58,19 +99,7 @@ def chunk_text(text: str, chunk_size: int, overlap: int = 0) -> List[str]:
     Returns:
         List of text chunks
     """
-    if len(text) <= chunk_size:
-        return [text]
-
-    chunks = []
-    start = 0
-
-    while start < len(text):
-        end = start + chunk_size
-        chunk = text[start:end]
-        chunks.append(chunk)
-        start = end - overlap
-
-    return chunks
+    return [text[start:start + chunk_size] for start in chunk_offsets(len(text), chunk_size, overlap)]
 
 
 def sanitize_input(text: str, max_length: int = 10000) -> str:
@@ -1,10 +1,42 @@
 """Structured logging configuration."""
 
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional
 from app.config import settings
 
+# Log records are enqueued on the calling thread and written to stdout by a
+# single listener thread, so request handlers never block on the write. Every
+# logger shares the queue and this one output handler, so each record is
+# written exactly once.
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_output_handler = logging.StreamHandler(sys.stdout)
+_output_handler.setLevel(logging.DEBUG)
+_output_handler.setFormatter(logging.Formatter(
+    "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+))
+_listener: Optional[QueueListener] = None
+
+
+def start_log_listener() -> None:
+    """Start the background thread that writes queued log records."""
+    global _listener
+    if _listener is None:
+        _listener = QueueListener(_log_queue, _output_handler, respect_handler_level=True)
+        _listener.start()
+
+
+def stop_log_listener() -> None:
+    """Flush queued log records and stop the background writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 
 def setup_logger(name: Optional[str] = None) -> logging.Logger:
     """
@@ -23,24 +55,15 @@ def setup_logger(name: Optional[str] = None) -> logging.Logger:
         return logger
 
     logger.setLevel(getattr(logging, settings.log_level.upper(), logging.INFO))
-
-    # Console handler
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(logging.DEBUG)
-
-    # Formatter
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
-    handler.setFormatter(formatter)
-
-    logger.addHandler(handler)
+    logger.addHandler(QueueHandler(_log_queue))
     logger.propagate = False
 
     return logger
 
 
+# The listener lives for the whole process: started here, flushed at exit
+start_log_listener()
+atexit.register(stop_log_listener)
+
 # Default logger
 logger = setup_logger("ai_agent_system")
-
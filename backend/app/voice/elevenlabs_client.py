@@ -1,7 +1,8 @@
 """ElevenLabs TTS client implementation."""
 
-from typing import Optional
+from typing import AsyncIterator, Optional
 import httpx
+import orjson
 from app.config import settings
 from app.utils.logger import logger
 
@@ -23,13 +24,12 @@ class ElevenLabsClient:
 
         self.voice_id = voice_id or settings.elevenlabs_voice_id
         self.base_url = "https://api.elevenlabs.io/v1"
-        self.client = httpx.AsyncClient(
-            headers={
-                "xi-api-key": self.api_key,
-                "Content-Type": "application/json"
-            },
-            timeout=30.0
-        )
+        self._headers = {
+            "xi-api-key": self.api_key,
+            "Content-Type": "application/json"
+        }
+        # The HTTP client is created on first request, so unused instances open no pools
+        self._client: Optional[httpx.AsyncClient] = None
         logger.info(f"Initialized ElevenLabs client with voice: {self.voice_id}")
 
     async def text_to_speech(
@@ -66,7 +66,7 @@ class ElevenLabsClient:
                 }
             }
 
-            response = await self.client.post(url, json=payload)
+            response = await self._get_client().post(url, content=orjson.dumps(payload))
             response.raise_for_status()
 
             audio_data = response.content
@@ -80,6 +80,58 @@ class ElevenLabsClient:
             logger.error(f"Error in ElevenLabs TTS: {str(e)}", exc_info=True)
             raise
 
+    async def text_to_speech_stream(
+        self,
+        text: str,
+        voice_id: Optional[str] = None,
+        model_id: str = "eleven_monolingual_v1",
+        stability: float = 0.5,
+        similarity_boost: float = 0.75,
+        chunk_size: int = 4096
+    ) -> AsyncIterator[bytes]:
+        """
+        Convert text to speech, yielding audio as it arrives.
+
+        Uses the streaming endpoint so playback can start on the first chunk
+        and memory stays bounded by chunk_size rather than the whole clip.
+
+        Args:
+            text: Text to convert
+            voice_id: Voice ID (defaults to instance voice_id)
+            model_id: Model ID to use
+            stability: Stability parameter (0.0-1.0)
+            similarity_boost: Similarity boost parameter (0.0-1.0)
+            chunk_size: Maximum bytes per yielded chunk
+
+        Yields:
+            Audio data chunks (MP3 format)
+        """
+        voice = voice_id or self.voice_id
+        url = f"{self.base_url}/text-to-speech/{voice}/stream"
+
+        payload = {
+            "text": text,
+            "model_id": model_id,
+            "voice_settings": {
+                "stability": stability,
+                "similarity_boost": similarity_boost
+            }
+        }
+
+        try:
+            async with self._get_client().stream("POST", url, content=orjson.dumps(payload)) as response:
+                if response.is_error:
+                    await response.aread()
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(chunk_size=chunk_size):
+                    yield chunk
+        except httpx.HTTPStatusError as e:
+            logger.error(f"ElevenLabs API error: {e.response.status_code} - {e.response.text}")
+            raise
+        except Exception as e:
+            logger.error(f"Error in ElevenLabs TTS stream: {str(e)}", exc_info=True)
+            raise
+
     async def get_voices(self) -> list:
         """
         Get list of available voices.
@@ -89,15 +141,27 @@ class ElevenLabsClient:
         """
         try:
             url = f"{self.base_url}/voices"
-            response = await self.client.get(url)
+            response = await self._get_client().get(url)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             return data.get("voices", [])
         except Exception as e:
             logger.error(f"Error getting voices: {str(e)}", exc_info=True)
             raise
 
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get or create the pooled HTTP client."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self._headers,
+                timeout=30.0,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=100)
+            )
+        return self._client
+
     async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+        """Close the HTTP client if one was opened."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
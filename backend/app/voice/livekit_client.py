@@ -128,6 +128,16 @@ class LiveKitClient:
             logger.error(f"Error creating LiveKit room: {str(e)}", exc_info=True)
             raise
 
+    @staticmethod
+    def _room_summary(room: Any) -> Dict[str, Any]:
+        """Convert a LiveKit room message to a summary dictionary."""
+        return {
+            "name": room.name,
+            "sid": room.sid,
+            "num_participants": room.num_participants,
+            "creation_time": room.creation_time
+        }
+
     async def list_rooms(self) -> List[Dict[str, Any]]:
         """
         List all active rooms.
@@ -136,16 +146,8 @@ class LiveKitClient:
             List of room dictionaries
         """
         try:
-            rooms = await self.livekit_api.room.list_rooms()
-            return [
-                {
-                    "name": room.name,
-                    "sid": room.sid,
-                    "num_participants": room.num_participants,
-                    "creation_time": room.creation_time
-                }
-                for room in rooms.rooms
-            ]
+            rooms = await self.livekit_api.room.list_rooms(api.ListRoomsRequest())
+            return [self._room_summary(room) for room in rooms.rooms]
         except Exception as e:
             logger.error(f"Error listing rooms: {str(e)}", exc_info=True)
             raise
@@ -161,10 +163,11 @@ class LiveKitClient:
             Room information or None if not found
         """
         try:
-            rooms = await self.list_rooms()
-            for room in rooms:
-                if room["name"] == room_name:
-                    return room
+            # Let the server filter by name instead of fetching every active room
+            rooms = await self.livekit_api.room.list_rooms(api.ListRoomsRequest(names=[room_name]))
+            for room in rooms.rooms:
+                if room.name == room_name:
+                    return self._room_summary(room)
             return None
         except Exception as e:
             logger.error(f"Error getting room: {str(e)}", exc_info=True)
@@ -2,6 +2,7 @@
 
 from typing import Dict, Any, Optional
 import httpx
+import orjson
 from app.config import settings
 from app.utils.logger import logger
 
@@ -21,13 +22,12 @@ class VapiClient:
             raise ValueError("Vapi API key is required")
 
         self.base_url = settings.vapi_api_url
-        self.client = httpx.AsyncClient(
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            },
-            timeout=30.0
-        )
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        # The HTTP client is created on first request, so unused instances open no pools
+        self._client: Optional[httpx.AsyncClient] = None
         logger.info("Initialized Vapi client")
 
     async def create_call(
@@ -59,10 +59,10 @@ class VapiClient:
             elif assistant_config:
                 payload["assistant"] = assistant_config
 
-            response = await self.client.post(url, json=payload)
+            response = await self._get_client().post(url, content=orjson.dumps(payload))
             response.raise_for_status()
 
-            result = response.json()
+            result = orjson.loads(response.content)
             logger.info(f"Created Vapi call: {result.get('id')}")
             return result
 
@@ -85,9 +85,9 @@ class VapiClient:
         """
         try:
             url = f"{self.base_url}/call/{call_id}"
-            response = await self.client.get(url)
+            response = await self._get_client().get(url)
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         except Exception as e:
             logger.error(f"Error getting call: {str(e)}", exc_info=True)
             raise
@@ -104,14 +104,26 @@ class VapiClient:
         """
         try:
             url = f"{self.base_url}/call/{call_id}/end"
-            response = await self.client.post(url)
+            response = await self._get_client().post(url)
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         except Exception as e:
             logger.error(f"Error ending call: {str(e)}", exc_info=True)
             raise
 
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get or create the pooled HTTP client."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self._headers,
+                timeout=30.0,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=100)
+            )
+        return self._client
+
     async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+        """Close the HTTP client if one was opened."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
@@ -1,21 +1,35 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { WebSocketService } from '../services/websocket';
 
 export function useVoiceAgent() {
   const [isConnected, setIsConnected] = useState(false);
   const [messages, setMessages] = useState<Array<{ role: string; content: string }>>([]);
   const [wsService, setWsService] = useState<WebSocketService | null>(null);
+  const streamingRef = useRef(false);
 
   useEffect(() => {
     const service = new WebSocketService();
     setWsService(service);
 
     const messageHandler = (data: any) => {
-      if (data.type === 'response') {
+      if (data.type === 'delta') {
+        const isContinuation = streamingRef.current;
+        streamingRef.current = true;
+        setMessages((prev) => {
+          if (!isContinuation) {
+            return [...prev, { role: 'assistant', content: data.text }];
+          }
+          const last = prev[prev.length - 1];
+          return [...prev.slice(0, -1), { ...last, content: last.content + data.text }];
+        });
+      } else if (data.type === 'done') {
+        streamingRef.current = false;
+      } else if (data.type === 'response') {
         setMessages((prev) => [...prev, { role: 'assistant', content: data.message }]);
       } else if (data.type === 'connection') {
         setIsConnected(true);
       } else if (data.type === 'error') {
+        streamingRef.current = false;
         setMessages((prev) => [...prev, { role: 'assistant', content: data.message }]);
       }
     };
@@ -0,0 +1,40 @@
+"""Shared pytest fixtures."""
+
+from unittest.mock import MagicMock
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope="session")
+def embedding_generator():
+    """Embedding generator with the configured model, loaded once per test session."""
+    from app.rag.embeddings import EmbeddingGenerator
+    return EmbeddingGenerator()
+
+
+@pytest.fixture(scope="session")
+def vector_store(embedding_generator, tmp_path_factory):
+    """Vector store persisted to a temporary directory, created once per test session."""
+    import chromadb
+    from app.rag.vectorstore import VectorStore
+    path = str(tmp_path_factory.mktemp("chroma"))
+    # Never reach a configured ChromaDB server or the working-directory fallback
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(chromadb, "HttpClient", lambda **kwargs: chromadb.PersistentClient(path=path))
+        return VectorStore(embedding_generator=embedding_generator)
+
+
+@pytest.fixture
+def mock_vector_store():
+    """VectorStore wired to a mock embedding generator and collection, without a ChromaDB client."""
+    from app.rag.vectorstore import VectorStore
+    vector_store = VectorStore.__new__(VectorStore)
+    vector_store.collection_name = "docs"
+    vector_store.embedding_generator = MagicMock()
+    vector_store.embedding_generator.generate_batch.side_effect = (
+        lambda texts: np.zeros((len(texts), 3), dtype=np.float32)
+    )
+    vector_store.collection = MagicMock()
+    vector_store.search_cache = None
+    vector_store._count_cache = None
+    return vector_store
@@ -0,0 +1,25 @@
+"""Tests for the agent pool."""
+
+from app.agents.agent_pool import AgentPool
+from app.agents.chat_agent import ChatAgent
+
+
+def test_agent_pool_reuses_and_bounds_agents():
+    """Test that pooled agents are reused and the least recently used is evicted."""
+    pool = AgentPool(maxsize=2)
+    first = pool.get_or_create("a", lambda: ChatAgent(agent_id="a"))
+    assert pool.get_or_create("a", lambda: ChatAgent(agent_id="other")) is first
+
+    pool.get_or_create("b", lambda: ChatAgent(agent_id="b"))
+    pool.get_or_create("c", lambda: ChatAgent(agent_id="c"))
+    assert [key for key, _ in pool.items()] == ["b", "c"]
+
+
+def test_agent_pool_expires_idle_agents():
+    """Test that expired agents are dropped and recreated."""
+    pool = AgentPool(ttl=3600)
+    first = pool.get_or_create("a", lambda: ChatAgent(agent_id="a"))
+    pool.expire_in("a", 0)
+    assert pool.get("a") is None
+    assert pool.items() == []
+    assert pool.get_or_create("a", lambda: ChatAgent(agent_id="a")) is not first
@@ -1,11 +1,20 @@
 """Tests for agents."""
 
 import pytest
+from unittest.mock import AsyncMock
 from app.agents.chat_agent import ChatAgent
 from app.agents.voice_agent import VoiceAgent
 from app.agents.base_agent import BaseAgent, Message
 
 
+def make_llm_client(content="Reply", model="test", usage=None, prompt_caching=False):
+    """Create a mock LLM client returning a fixed chat response."""
+    client = AsyncMock()
+    client.supports_prompt_caching = prompt_caching
+    client.chat.return_value = {"content": content, "model": model, "usage": usage or {}}
+    return client
+
+
 @pytest.mark.asyncio
 async def test_message_creation():
     """Test message creation."""
@@ -48,3 +57,200 @@ def test_agent_stats():
     assert "message_count" in stats
     assert "total_tokens_used" in stats
 
+
+def test_history_keeps_system_message_on_eviction():
+    """Test that trimming history evicts old turns but keeps the system message."""
+    agent = ChatAgent(agent_id="test_agent", max_history=3)
+    for i in range(5):
+        agent.add_message("user", f"Message {i}")
+    history = agent.conversation_history
+    assert history[0].role == "system"
+    assert [msg.content for msg in history[1:]] == ["Message 2", "Message 3", "Message 4"]
+
+
+def test_conversation_context_respects_token_budget():
+    """Test that context keeps the most recent messages within the token budget."""
+    agent = ChatAgent(agent_id="test_agent", system_prompt="s" * 40)
+    agent.add_message("user", "a" * 40)
+    agent.add_message("assistant", "b" * 40)
+    context = agent.get_conversation_context(max_tokens=20)
+    assert [msg["role"] for msg in context] == ["user", "assistant"]
+
+
+@pytest.mark.asyncio
+async def test_chat_agent_process_sends_slot_hint():
+    """Test that chat requests carry the agent's stable cache slot."""
+    agent = ChatAgent(agent_id="test_agent")
+    agent.llm_client = make_llm_client(
+        content="Hi there",
+        model="claude-test",
+        usage={"input_tokens": 10, "output_tokens": 5}
+    )
+    result = await agent.process("Hello")
+    assert result["response"] == "Hi there"
+    assert agent.llm_client.chat.call_args.kwargs["slot_id"] == agent._slot_id
+
+
+@pytest.mark.asyncio
+async def test_chat_agent_semantic_cache_runs_off_event_loop():
+    """Test that semantic cache lookups and stores (which embed text) run on worker threads."""
+    import threading
+    from unittest.mock import MagicMock
+    loop_thread = threading.get_ident()
+    threads = []
+    cache = MagicMock()
+    cache.lookup.side_effect = lambda *args: threads.append(threading.get_ident())
+    cache.store.side_effect = lambda *args: threads.append(threading.get_ident())
+    agent = ChatAgent(agent_id="test_agent", semantic_cache=cache)
+    agent.llm_client = make_llm_client()
+
+    await agent.process("Hello")
+    cache.store.assert_called_once()
+    assert len(threads) == 2 and loop_thread not in threads
+
+
+@pytest.mark.asyncio
+async def test_chat_agent_marks_cacheable_prefix():
+    """Test that prompt-caching clients get the stable prefix length and the system prompt."""
+    agent = ChatAgent(agent_id="test_agent")
+    agent.llm_client = make_llm_client(prompt_caching=True)
+
+    await agent.process("First")
+    await agent.process("Second")
+    call_kwargs = agent.llm_client.chat.call_args.kwargs
+    assert call_kwargs["cache_prefix_len"] == len(call_kwargs["messages"]) - 1
+
+
+def test_model_rates_match_by_family():
+    """Test pricing lookup for dated model IDs and unknown models."""
+    from app.agents.chat_agent import _model_rates
+    assert _model_rates("claude-3-5-sonnet-20241022") == (0.003, 0.015)
+    assert _model_rates("gpt-4-0125-preview") == (0.01, 0.03)
+    assert _model_rates("unknown-model") == (0.0, 0.0)
+
+
+def test_voice_agents_share_tts_client():
+    """Test that voice agents reuse one TTS client."""
+    from unittest.mock import patch
+    with patch("app.agents.voice_agent.ElevenLabsClient") as client_cls:
+        VoiceAgent._tts_client = None
+        first = VoiceAgent(agent_id="voice_1", voice_id="voice_a")
+        second = VoiceAgent(agent_id="voice_2", voice_id="voice_b")
+        assert first.get_shared_tts_client() is second.get_shared_tts_client()
+        client_cls.assert_called_once()
+        VoiceAgent._tts_client = None
+
+
+@pytest.mark.asyncio
+async def test_voice_agent_streams_sentences_to_tts():
+    """Test that streamed text is synthesized sentence by sentence and usage is tracked."""
+    from unittest.mock import MagicMock
+    agent = VoiceAgent(agent_id="voice_test")
+
+    async def fake_stream(**kwargs):
+        for chunk in ("Hello there. How ", "are you? Fine"):
+            yield chunk
+
+    agent.llm_client = MagicMock(model="claude-test", supports_prompt_caching=False)
+    agent.llm_client.stream_response = fake_stream
+    tts_client = AsyncMock()
+    tts_client.text_to_speech.side_effect = lambda text, voice_id: text.encode()
+    agent._get_tts_client = AsyncMock(return_value=tts_client)
+
+    result = await agent.process("Hi", stream=True)
+    assert result["response"] == "Hello there. How are you? Fine"
+    spoken = [call.kwargs["text"] for call in tts_client.text_to_speech.call_args_list]
+    assert spoken == ["Hello there.", "How are you?", "Fine"]
+    assert result["audio"]["segments"] == [b"Hello there.", b"How are you?", b"Fine"]
+    assert result["usage"]["output_tokens"] > 0
+    assert agent.total_tokens_used == result["usage"]["input_tokens"] + result["usage"]["output_tokens"]
+    assert agent.total_cost > 0
+
+
+@pytest.mark.asyncio
+async def test_voice_agent_streaming_uses_semantic_cache():
+    """Test that streamed voice replies are cached and near-duplicates skip the LLM."""
+    from unittest.mock import MagicMock
+    cache = MagicMock()
+    cache.lookup.return_value = None
+    agent = VoiceAgent(agent_id="voice_test", semantic_cache=cache)
+
+    async def fake_stream(**kwargs):
+        yield "Hello there."
+
+    agent.llm_client = MagicMock(model="test", supports_prompt_caching=False)
+    agent.llm_client.stream_response = fake_stream
+    tts_client = AsyncMock()
+    tts_client.text_to_speech.side_effect = lambda text, voice_id: text.encode()
+    agent._get_tts_client = AsyncMock(return_value=tts_client)
+
+    await agent.process("Hi", stream=True)
+    cache.store.assert_called_once()
+    cache.lookup.return_value = {"response": "Cached hello.", "model": "test", "metadata": {}}
+    agent.llm_client.stream_response = MagicMock(side_effect=AssertionError("LLM called on cache hit"))
+
+    result = await agent.process("Hi", stream=True)
+    assert result["response"] == "Cached hello."
+    assert result["metadata"]["cached"] is True
+    assert result["audio"]["segments"] == [b"Cached hello."]
+    assert [m["content"] for m in agent.get_conversation_context()[-2:]] == ["Hi", "Cached hello."]
+
+
+@pytest.mark.asyncio
+async def test_system_prompt_sent_only_when_evicted_from_context():
+    """Test the separate system prompt is only passed when context lacks it."""
+    agent = ChatAgent(agent_id="test_agent", system_prompt="s" * 400)
+    agent.llm_client = make_llm_client()
+
+    await agent.process("Hello")
+    assert agent.llm_client.chat.call_args.kwargs["system_prompt"] is None
+
+    await agent.process("Hello again", max_tokens=50)
+    assert agent.llm_client.chat.call_args.kwargs["system_prompt"] == agent.system_prompt
+
+
+def test_message_timestamp_serialization():
+    """Test message timestamps serialize consistently."""
+    message = Message("user", "Hello")
+    assert message.to_dict()["timestamp"] == message.timestamp.isoformat()
+
+
+def test_generate_message_id_unique():
+    """Test that message IDs are unique and 16 hex characters."""
+    from app.utils.helpers import generate_message_id
+    ids = [generate_message_id() for _ in range(1000)]
+    assert len(set(ids)) == 1000
+    assert all(len(i) == 16 and int(i, 16) >= 0 for i in ids)
+
+
+@pytest.mark.asyncio
+async def test_elevenlabs_client_opens_http_client_lazily():
+    """Test that the TTS client creates its HTTP pool on first use only."""
+    from app.voice.elevenlabs_client import ElevenLabsClient
+    tts_client = ElevenLabsClient(api_key="test-key", voice_id="voice")
+    assert tts_client._client is None
+    http_client = tts_client._get_client()
+    assert tts_client._get_client() is http_client
+    assert http_client.headers["xi-api-key"] == "test-key"
+    await tts_client.close()
+    assert http_client.is_closed and tts_client._client is None
+
+
+@pytest.mark.asyncio
+async def test_elevenlabs_streams_audio_chunks():
+    """Test that streamed TTS yields the body in bounded chunks from the stream endpoint."""
+    import httpx
+    from app.voice.elevenlabs_client import ElevenLabsClient
+    requested = []
+
+    def handler(request):
+        requested.append(request.url.path)
+        return httpx.Response(200, content=b"a" * 10000)
+
+    tts_client = ElevenLabsClient(api_key="test-key", voice_id="voice")
+    tts_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    chunks = [chunk async for chunk in tts_client.text_to_speech_stream("Hello", chunk_size=4096)]
+    await tts_client.close()
+
+    assert requested == ["/v1/text-to-speech/voice/stream"]
+    assert [len(chunk) for chunk in chunks] == [4096, 4096, 1808]
@@ -34,3 +34,349 @@ def test_list_mcp_tools():
     assert response.status_code == 200
     assert "tools" in response.json()
 
+
+def test_tool_schemas_cached_until_registration():
+    """Test that tool schemas are serialized once and refreshed on register."""
+    import orjson
+    from app.mcp.tools import MCPToolRegistry, CalculatorTool
+    registry = MCPToolRegistry()
+    payload = registry.list_tools_json()
+    assert registry.list_tools_json() is payload
+    assert orjson.loads(payload) == registry.list_tools()
+
+    tool = CalculatorTool()
+    tool.name = "calculator_2"
+    registry.register(tool)
+    assert len(orjson.loads(registry.list_tools_json())) == len(orjson.loads(payload)) + 1
+
+
+def test_mcp_server_is_shared():
+    """Test that the MCP server dependency is reused across requests."""
+    from app.api.routes import get_mcp_server
+    assert get_mcp_server() is get_mcp_server()
+
+
+@pytest.mark.asyncio
+async def test_close_clients_drops_closed_mcp_server():
+    """Test that shutdown closes the shared MCP server and a later request gets a fresh one."""
+    from app.api.routes import close_clients, get_mcp_server
+    server = get_mcp_server()
+    await close_clients()
+    assert get_mcp_server() is not server
+
+
+def test_vector_store_built_once_under_concurrency(monkeypatch):
+    """Test that concurrent first calls to the vector store dependency build it once."""
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from unittest.mock import MagicMock
+    from app.api import routes
+    builds = MagicMock(side_effect=lambda **kwargs: time.sleep(0.05) or object())
+    monkeypatch.setattr(routes, "VectorStore", builds)
+    routes._build_vector_store.cache_clear()
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            stores = list(pool.map(lambda _: routes.get_vector_store(), range(8)))
+        builds.assert_called_once()
+        assert all(store is stores[0] for store in stores)
+    finally:
+        routes._build_vector_store.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_cancels_pending_warmup(monkeypatch):
+    """Test that shutdown does not leave the warmup task pending."""
+    import threading
+    from app import main
+    release = threading.Event()
+    monkeypatch.setattr(main, "prewarm", lambda: release.wait(5))
+    try:
+        async with main.lifespan(app):
+            assert not app.state.warmup_task.done()
+        assert app.state.warmup_task.cancelled()
+    finally:
+        release.set()
+
+
+def test_rag_search_runs_off_event_loop():
+    """Test that the blocking retriever call runs in a worker thread."""
+    import asyncio
+    from unittest.mock import MagicMock
+    from app.api.routes import get_rag_retriever
+    from app.rag.vectorstore import RetrievalResult
+    on_loop = []
+    retriever = MagicMock()
+
+    def retrieve(query, top_k):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return [RetrievalResult(id="a", document="A", metadata={}, distance=0.1, score=0.9)]
+
+    retriever.retrieve.side_effect = retrieve
+    app.dependency_overrides[get_rag_retriever] = lambda: retriever
+    try:
+        response = client.get("/api/rag/search", params={"query": "q", "top_k": 1})
+    finally:
+        app.dependency_overrides.pop(get_rag_retriever)
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["id"] == "a"
+    assert on_loop == [False]
+
+
+@pytest.mark.asyncio
+async def test_mcp_execute_tools_preserves_order():
+    """Test that concurrent tool execution keeps results in call order."""
+    import asyncio
+    from app.mcp.server import MCPServer
+
+    server = MCPServer()
+
+    async def fake_execute(tool_name, parameters):
+        await asyncio.sleep(parameters["delay"])
+        if tool_name == "fail":
+            raise RuntimeError("boom")
+        return {"tool": tool_name, "success": True}
+
+    server.tool_registry.execute_tool = fake_execute
+    results = await server.execute_tools([
+        {"name": "slow", "input": {"delay": 0.02}},
+        {"name": "fail", "input": {"delay": 0}},
+        {"name": "fast", "arguments": '{"delay": 0}'},
+    ])
+
+    assert [r["tool"] for r in results] == ["slow", "fail", "fast"]
+    assert results[1]["success"] is False
+    assert results[1]["error"] == "boom"
+
+
+@pytest.mark.asyncio
+async def test_registry_execute_tools_caps_concurrency():
+    """Test that concurrent tool execution respects the concurrency limit."""
+    import asyncio
+    from app.mcp.tools import MCPToolRegistry
+
+    registry = MCPToolRegistry()
+    running = 0
+    peak = 0
+
+    async def fake_execute(tool_name, parameters):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"tool": tool_name}
+
+    registry.execute_tool = fake_execute
+    results = await registry.execute_tools([(f"tool_{i}", {}) for i in range(6)], max_concurrency=2)
+    assert [r["tool"] for r in results] == [f"tool_{i}" for i in range(6)]
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_api_call_tool_reuses_client():
+    """Test that the API call tool keeps one pooled HTTP client across calls."""
+    import httpx
+    from app.mcp.tools import MCPToolRegistry
+
+    async with MCPToolRegistry() as registry:
+        tool = registry.get_tool("api_call")
+        tool._client = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"ok": True}))
+        )
+        client = tool._client
+
+        for _ in range(2):
+            result = await tool.execute(url="https://example.com/api")
+            assert result["result"]["response"] == {"ok": True}
+        assert tool._client is client
+
+    assert tool._client is None
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_api_call_tool_caches_gets():
+    """Test that repeated GETs are served from cache unless the server forbids it."""
+    import httpx
+    from app.mcp.tools import APICallTool
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        headers = {"cache-control": "no-store"} if request.url.path == "/live" else {}
+        return httpx.Response(200, json={"n": len(calls)}, headers=headers)
+
+    tool = APICallTool()
+    tool._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    first = await tool.execute(url="https://example.com/docs")
+    second = await tool.execute(url="https://example.com/docs")
+    assert second["result"] == first["result"]
+    await tool.execute(url="https://example.com/live")
+    await tool.execute(url="https://example.com/live")
+    assert calls == ["/docs", "/live", "/live"]
+    await tool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_api_call_tool_sends_json_body():
+    """Test that request bodies are sent as JSON and JSON replies are decoded."""
+    import httpx
+    import orjson
+    from app.mcp.tools import APICallTool
+
+    def handler(request):
+        assert request.headers["content-type"] == "application/json"
+        return httpx.Response(200, json={"echo": orjson.loads(request.content)})
+
+    tool = APICallTool()
+    tool._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    result = await tool.execute(url="https://example.com/api", method="POST", body={"a": 1})
+    assert result["result"]["response"] == {"echo": {"a": 1}}
+    await tool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_calculator_tool_evaluates_arithmetic_only():
+    """Test that the calculator evaluates arithmetic and rejects other syntax."""
+    from app.mcp.tools import CalculatorTool
+    tool = CalculatorTool()
+
+    result = await tool.execute(expression="(1.5 + 2) * 4 - 2 ** 3")
+    assert result["result"]["result"] == 6.0
+    assert (await tool.execute(expression="1, 2"))["success"] is False
+    assert (await tool.execute(expression="9 ** 9 ** 9"))["success"] is False
+    assert (await tool.execute(expression="((9 ** 999) ** 999) ** 999"))["success"] is False
+    assert (await tool.execute(expression="(9 ** 999) * (9 ** 999)"))["success"] is False
+    assert (await tool.execute(expression="2 ** 1000"))["result"]["result"] == 2 ** 1000
+
+
+@pytest.mark.asyncio
+async def test_file_read_tool_stays_in_base_dir(tmp_path):
+    """Test that the file read tool reads inside its base path only."""
+    from app.mcp.tools import FileReadTool
+    base = tmp_path / "data"
+    base.mkdir()
+    (base / "note.txt").write_text("hello", encoding="utf-8")
+    (tmp_path / "data2").mkdir()
+    (tmp_path / "data2" / "secret.txt").write_text("secret", encoding="utf-8")
+    tool = FileReadTool(base_path=str(base))
+
+    assert (await tool.execute(file_path="note.txt"))["result"]["content"] == "hello"
+    assert (await tool.execute(file_path="../data2/secret.txt"))["success"] is False
+
+
+@pytest.mark.asyncio
+async def test_file_read_tool_truncates_large_files(tmp_path):
+    """Test that reads past the size cap are truncated and flagged."""
+    from app.mcp.tools import FileReadTool
+    (tmp_path / "big.txt").write_text("a" * 100, encoding="utf-8")
+    tool = FileReadTool(base_path=str(tmp_path), max_bytes=10)
+
+    result = (await tool.execute(file_path="big.txt"))["result"]
+    assert result["content"] == "a" * 10
+    assert result["content_truncated"] is True
+    assert result["file_size"] == 100
+
+
+def test_websocket_ping():
+    """Test WebSocket connection greeting and ping/pong."""
+    with client.websocket_connect("/api/ws/test_client") as ws:
+        assert ws.receive_json()["type"] == "connection"
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+
+
+@pytest.mark.asyncio
+async def test_broadcast_drops_failed_connections():
+    """Test that broadcast reaches healthy clients and disconnects failed ones."""
+    from unittest.mock import AsyncMock
+    from app.api.websocket import ConnectionManager
+
+    manager = ConnectionManager()
+    healthy, broken = AsyncMock(), AsyncMock()
+    broken.send_text.side_effect = RuntimeError("closed")
+    manager.active_connections = {"healthy": healthy, "broken": broken}
+
+    await manager.broadcast({"type": "notice"})
+    healthy.send_text.assert_awaited_once_with('{"type":"notice"}')
+    assert list(manager.active_connections) == ["healthy"]
+
+
+def test_websocket_streams_deltas(monkeypatch):
+    """Test that WebSocket responses stream as delta frames then a done frame."""
+    from app.agents.chat_agent import ChatAgent
+
+    async def fake_stream(self, user_input, **kwargs):
+        for chunk in ("Hel", "lo"):
+            yield chunk
+
+    monkeypatch.setattr(ChatAgent, "stream_response", fake_stream)
+    with client.websocket_connect("/api/ws/stream_client") as ws:
+        ws.receive_json()
+        ws.send_json({"type": "message", "message": "Hi"})
+        frames = []
+        while not frames or frames[-1]["type"] != "done":
+            frames.append(ws.receive_json())
+    assert "".join(f["text"] for f in frames if f["type"] == "delta") == "Hello"
+
+
+def test_request_models_are_frozen():
+    """Test request models strip whitespace, ignore extras and reject mutation."""
+    from pydantic import ValidationError
+    from app.api.routes import ChatRequest
+
+    request = ChatRequest(message="  hello  ", unexpected="x")
+    assert request.message == "hello"
+    with pytest.raises(ValidationError):
+        request.message = "changed"
+
+
+@pytest.mark.asyncio
+async def test_vapi_client_sends_orjson_body():
+    """Test that Vapi payloads are serialized with orjson and sent as JSON."""
+    import httpx
+    import orjson
+    from app.voice.vapi_client import VapiClient
+    seen = {}
+
+    def handler(request):
+        seen["content_type"] = request.headers["content-type"]
+        seen["body"] = orjson.loads(request.content)
+        return httpx.Response(201, json={"id": "call_1"})
+
+    vapi_client = VapiClient(api_key="test-key")
+    vapi_client._client = httpx.AsyncClient(
+        headers=vapi_client._headers, transport=httpx.MockTransport(handler)
+    )
+    result = await vapi_client.create_call("+15550100", assistant_id="assistant")
+    await vapi_client.close()
+
+    assert result == {"id": "call_1"}
+    assert seen == {
+        "content_type": "application/json",
+        "body": {"phoneNumberId": "+15550100", "assistantId": "assistant"},
+    }
+
+
+def test_logger_writes_through_queue_listener(capsys):
+    """Test that log calls are enqueued and each record is written once by the listener."""
+    from logging.handlers import QueueHandler
+    from app.utils import logger as logger_module
+    import sys
+    test_logger = logger_module.setup_logger("queue_listener_test")
+    logger_module.setup_logger("queue_listener_other")
+    # The shared handler captured stdout at import; point it at capsys's stream
+    original_stream = logger_module._output_handler.setStream(sys.stdout)
+    try:
+        assert isinstance(test_logger.handlers[0], QueueHandler)
+        test_logger.warning("queued %s", "message")
+        logger_module.stop_log_listener()
+        assert capsys.readouterr().out.count("WARNING - queued message") == 1
+    finally:
+        logger_module._output_handler.setStream(original_stream)
+        logger_module.start_log_listener()
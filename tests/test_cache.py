@@ -0,0 +1,40 @@
+"""Tests for response caching."""
+
+from app.cache.semantic_cache import SemanticCache
+
+
+class FakeEmbedder:
+    """Embedder that maps known phrases to fixed vectors."""
+
+    vectors = {
+        "hello there": [1.0, 0.0],
+        "hello there!": [0.99, 0.05],
+        "what is the weather": [0.0, 1.0],
+    }
+
+    def generate(self, text):
+        return self.vectors[text]
+
+
+def test_semantic_cache_hit_and_miss():
+    """Test that near-duplicate messages hit and unrelated ones miss."""
+    cache = SemanticCache(embedding_generator=FakeEmbedder(), threshold=0.9)
+    cache.store("agent", None, "Hello there", {"response": "Hi!"})
+    assert cache.lookup("agent", None, "hello there!")["response"] == "Hi!"
+    assert cache.lookup("agent", None, "what is the weather") is None
+
+
+def test_semantic_cache_scoped_by_context():
+    """Test that cached replies don't leak across conversational contexts."""
+    cache = SemanticCache(embedding_generator=FakeEmbedder(), threshold=0.9)
+    cache.store("agent", "previous reply", "Hello there", {"response": "Hi!"})
+    assert cache.lookup("agent", None, "Hello there") is None
+    assert cache.lookup("other_agent", "previous reply", "Hello there") is None
+
+
+def test_semantic_cache_quantized():
+    """Test that int8-quantized embeddings still separate hits from misses."""
+    cache = SemanticCache(embedding_generator=FakeEmbedder(), threshold=0.9, quantize=True)
+    cache.store("agent", None, "Hello there", {"response": "Hi!"})
+    assert cache.lookup("agent", None, "hello there!")["response"] == "Hi!"
+    assert cache.lookup("agent", None, "what is the weather") is None
@@ -29,3 +29,138 @@ async def test_llm_factory_get_available_providers():
     providers = LLMFactory.get_available_providers()
     assert isinstance(providers, list)
 
+
+def test_get_settings_is_cached():
+    """Test that settings are parsed once and reused."""
+    from app.config import get_settings, settings
+    assert get_settings() is get_settings()
+    assert get_settings() is settings
+
+
+def test_parse_cors_origins():
+    """Test CORS origins parsing from a comma-separated string."""
+    from app.config import Settings
+    origins = Settings.parse_cors_origins(" http://a.test, http://b.test ,")
+    assert origins == ["http://a.test", "http://b.test"]
+    assert Settings.parse_cors_origins(["http://c.test"]) == ["http://c.test"]
+
+
+def test_embedding_backend_validation(monkeypatch):
+    """Test that only backends the pinned sentence-transformers supports are accepted."""
+    from pydantic import ValidationError
+    from app.config import Settings
+    monkeypatch.setenv("EMBEDDING_BACKEND", "Torch-Compile")
+    assert Settings(_env_file=None).embedding_backend == "torch-compile"
+    monkeypatch.setenv("EMBEDDING_BACKEND", "onnx")
+    with pytest.raises(ValidationError):
+        Settings(_env_file=None)
+
+
+def test_llm_factory_reuses_client():
+    """Test that the factory builds each provider's client once."""
+    from app.config import settings
+    with patch.object(settings, "openai_api_key", "test-key"):
+        LLMFactory._openai = None
+        LLMFactory._available = None
+        client = LLMFactory.get_client("openai")
+        assert LLMFactory.get_client("openai") is client
+        LLMFactory._openai = None
+    LLMFactory._available = None
+
+
+def test_llm_factory_available_providers_cached():
+    """Test that provider availability is resolved once."""
+    from app.config import settings
+    LLMFactory._available = None
+    with patch.object(settings, "anthropic_api_key", "test-key"), \
+            patch.object(settings, "openai_api_key", None):
+        assert LLMFactory.get_available_providers() == ["claude"]
+    assert LLMFactory.get_available_providers() == ["claude"]
+    LLMFactory._available = None
+
+
+def test_claude_messages_copied_only_when_needed():
+    """Test Claude message conversion passes conforming lists through."""
+    from app.llm.claude_client import _to_claude_messages
+    messages = [{"role": "user", "content": "Hi"}]
+    assert _to_claude_messages(messages) is messages
+    extra = [{"role": "user", "content": "Hi", "id": "1"}]
+    assert _to_claude_messages(extra) == messages
+
+
+def test_claude_messages_mark_cache_prefix():
+    """Test that the last prefix message gets a prompt-cache breakpoint."""
+    from app.llm.claude_client import _to_claude_messages
+    messages = [
+        {"role": "user", "content": "Hi"},
+        {"role": "assistant", "content": "Hello"},
+        {"role": "user", "content": "Again"},
+    ]
+    converted = _to_claude_messages(messages, cache_prefix_len=2)
+    assert converted[1]["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert converted[1]["content"][0]["text"] == "Hello"
+    assert converted[2] is messages[2]
+    assert messages[1] == {"role": "assistant", "content": "Hello"}
+
+
+def test_llm_factory_concurrent_init_builds_one_client():
+    """Test that concurrent first calls share a single client."""
+    from concurrent.futures import ThreadPoolExecutor
+    from app.config import settings
+    with patch.object(settings, "openai_api_key", "test-key"):
+        LLMFactory._openai = None
+        LLMFactory._available = None
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            clients = list(pool.map(lambda _: LLMFactory.get_client("openai"), range(8)))
+        assert all(c is clients[0] for c in clients)
+        LLMFactory._openai = None
+    LLMFactory._available = None
+
+
+@pytest.mark.asyncio
+async def test_claude_chat_text_only_response():
+    """Test that a single text block response skips tool-use extraction."""
+    from types import SimpleNamespace
+    client = ClaudeClient(api_key="test-key")
+    response = SimpleNamespace(
+        content=[SimpleNamespace(type="text", text="Hello")],
+        model="claude-test",
+        usage=SimpleNamespace(input_tokens=3, output_tokens=1),
+        stop_reason="end_turn"
+    )
+    client.client = SimpleNamespace(messages=SimpleNamespace(create=AsyncMock(return_value=response)))
+
+    result = await client.chat([{"role": "user", "content": "Hi"}])
+    assert result["content"] == "Hello"
+    assert result["tool_uses"] == []
+
+
+def test_settings_read_env_file_without_exporting(tmp_path, monkeypatch):
+    """Test that .env values reach Settings without being copied into os.environ."""
+    import os
+    from app.config import Settings
+    env_file = tmp_path / ".env"
+    env_file.write_text("LLM_NUM_SLOTS=7\n")
+    monkeypatch.delenv("LLM_NUM_SLOTS", raising=False)
+
+    assert Settings(_env_file=str(env_file)).llm_num_slots == 7
+    assert "LLM_NUM_SLOTS" not in os.environ
+    monkeypatch.setenv("LLM_NUM_SLOTS", "3")
+    assert Settings(_env_file=str(env_file)).llm_num_slots == 3
+
+
+def test_llm_factory_provider_normalization():
+    """Test that provider names and enum members select the same client."""
+    from app.config import settings
+    from app.llm.llm_factory import LLMProvider
+    with patch.object(settings, "openai_api_key", "test-key"):
+        LLMFactory._openai = None
+        LLMFactory._available = None
+        assert LLMFactory.get_client("openai") is LLMFactory.get_client(LLMProvider.OPENAI)
+        LLMFactory._openai = None
+    LLMFactory._available = None
+
+    with pytest.raises(ValueError):
+        LLMFactory.get_client("unknown")
+    with pytest.raises(ValueError):
+        LLMFactory.set_default_provider("unknown")
@@ -1,42 +1,507 @@
 """Tests for RAG system."""
 
+import importlib.util
+import numpy as np
 import pytest
+from unittest.mock import MagicMock
 from app.rag.embeddings import EmbeddingGenerator
-from app.rag.vectorstore import VectorStore
-from app.rag.retriever import RAGRetriever
 
+# Vector store and retriever modules import chromadb, so tests import them lazily
+requires_chromadb = pytest.mark.skipif(
+    importlib.util.find_spec("chromadb") is None, reason="chromadb not installed"
+)
 
-def test_embedding_generator():
+
+def test_embedding_generator(embedding_generator):
     """Test embedding generation."""
-    generator = EmbeddingGenerator()
-    embedding = generator.generate("test text")
-    assert isinstance(embedding, list)
+    embedding = embedding_generator.generate("test text")
+    assert isinstance(embedding, np.ndarray)
     assert len(embedding) > 0
 
 
-def test_embedding_batch():
+def test_embedding_batch(embedding_generator):
     """Test batch embedding generation."""
-    generator = EmbeddingGenerator()
-    embeddings = generator.generate_batch(["text1", "text2"])
+    embeddings = embedding_generator.generate_batch(["text1", "text2"])
     assert len(embeddings) == 2
 
 
+def test_embedding_dimension_cached(monkeypatch):
+    """Test that the embedding dimension is read from the model once."""
+    model = MagicMock()
+    model.get_sentence_embedding_dimension.return_value = 384
+    monkeypatch.setattr(EmbeddingGenerator, "_model_cache", {("fake-model", "cpu", "torch"): model})
+    monkeypatch.setattr(EmbeddingGenerator, "_dim_cache", {})
+
+    generator = EmbeddingGenerator(model_name="fake-model", device="cpu")
+    assert generator.get_embedding_dimension() == 384
+    assert generator.get_embedding_dimension() == 384
+    model.get_sentence_embedding_dimension.assert_called_once()
+    model.encode.assert_not_called()
+
+
+def test_models_cached_per_name_and_device(monkeypatch):
+    """Test that generators share a model only for the same name and device."""
+    loader = MagicMock(side_effect=lambda name, device: MagicMock(name=f"{name}@{device}"))
+    monkeypatch.setattr("app.rag.embeddings.SentenceTransformer", loader)
+    monkeypatch.setattr(EmbeddingGenerator, "_model_cache", {})
+
+    first = EmbeddingGenerator(model_name="model-a", device="cpu")
+    assert EmbeddingGenerator(model_name="model-a", device="cpu").model is first.model
+    assert EmbeddingGenerator(model_name="model-b", device="cpu").model is not first.model
+    assert loader.call_count == 2
+    first.model.half.assert_not_called()
+    assert EmbeddingGenerator(model_name="model-a", device="cuda").model.half.called
+
+
+def test_concurrent_generators_load_model_once(monkeypatch):
+    """Test that generators created on several threads at once share one model load."""
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    def slow_load(name, device):
+        time.sleep(0.05)
+        return MagicMock()
+
+    loader = MagicMock(side_effect=slow_load)
+    monkeypatch.setattr("app.rag.embeddings.SentenceTransformer", loader)
+    monkeypatch.setattr(EmbeddingGenerator, "_model_cache", {})
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        generators = list(pool.map(lambda _: EmbeddingGenerator(model_name="model-a", device="cpu"), range(4)))
+    assert loader.call_count == 1
+    assert all(generator.model is generators[0].model for generator in generators)
+
+
+def test_model_backends(monkeypatch):
+    """Test that models are cached per backend and compiled models warm up."""
+    loader = MagicMock(side_effect=lambda name, device, **kwargs: MagicMock(name=f"{name}@{device}"))
+    compile_fn = MagicMock(side_effect=lambda module, **kwargs: module)
+    monkeypatch.setattr("app.rag.embeddings.SentenceTransformer", loader)
+    monkeypatch.setattr("app.rag.embeddings.torch.compile", compile_fn)
+    monkeypatch.setattr(EmbeddingGenerator, "_model_cache", {})
+
+    eager = EmbeddingGenerator(model_name="model-a", device="cuda", backend="torch")
+    assert loader.call_args.kwargs == {"device": "cuda"}
+    eager.model.half.assert_called_once()
+    compile_fn.assert_not_called()
+
+    compiled = EmbeddingGenerator(model_name="model-a", device="cpu", backend="torch-compile")
+    assert compiled.model is not eager.model
+    compile_fn.assert_called_once()
+    compiled.model.encode.assert_called_once()
+
+
+def test_embeddings_returned_as_arrays(monkeypatch):
+    """Test that embeddings stay float32 arrays and similarity is a dot product."""
+    model = MagicMock()
+    model.encode.return_value = np.array([[0.6, 0.8]], dtype=np.float64)
+    monkeypatch.setattr(EmbeddingGenerator, "_model_cache", {("fake-model", "cpu", "torch"): model})
+
+    generator = EmbeddingGenerator(model_name="fake-model", device="cpu")
+    embedding = generator.generate("text")
+    assert embedding.dtype == np.float32
+    assert embedding.shape == (2,)
+    assert model.encode.call_args.args[0] == ["text"]
+    assert model.encode.call_args.kwargs["normalize_embeddings"] is True
+    assert EmbeddingGenerator.compute_similarity(embedding, embedding) == pytest.approx(1.0)
+
+
+def test_embedding_cache_skips_repeat_texts(monkeypatch):
+    """Test that cached texts are not re-encoded and batches encode each new text once."""
+    model = MagicMock()
+    model.encode.side_effect = lambda texts, **kwargs: np.eye(8)[[len(t) for t in texts]]
+    monkeypatch.setattr(EmbeddingGenerator, "_model_cache", {("fake-model", "cpu", "torch"): model})
+    generator = EmbeddingGenerator(model_name="fake-model", device="cpu")
+    generator.cache_size = 3
+
+    single = generator.generate("abc")
+    assert generator.generate("abc").tolist() == single.tolist() == np.eye(8)[3].tolist()
+    assert model.encode.call_count == 1
+
+    batch = generator.generate_batch(["abc", "de", "de", "fghi"])
+    assert batch.argmax(axis=1).tolist() == [3, 2, 2, 4]
+    assert batch.dtype == np.float32
+    assert all(row.dtype == np.float16 for row in generator._cache.values())
+    assert model.encode.call_args.args[0] == ["de", "fghi"]
+
+    generator.generate_batch(["j"])
+    assert len(generator._cache) == 3
+    generator.generate("abc")
+    assert model.encode.call_count == 4
+
+
+def test_embedding_cache_misses_keep_full_precision(monkeypatch):
+    """Test that freshly encoded rows are returned unrounded and only cached copies are fp16."""
+    row = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+    row /= np.linalg.norm(row)
+    model = MagicMock()
+    model.encode.side_effect = lambda texts, **kwargs: np.tile(row, (len(texts), 1))
+    monkeypatch.setattr(EmbeddingGenerator, "_model_cache", {("fake-model", "cpu", "torch"): model})
+    generator = EmbeddingGenerator(model_name="fake-model", device="cpu")
+
+    assert np.array_equal(generator.generate("abc"), row)
+    assert np.array_equal(generator.generate_batch(["abc", "de"])[1], row)
+    np.testing.assert_allclose(generator.generate("abc"), row, atol=1e-3)
+    assert np.linalg.norm(generator.generate("abc")) == pytest.approx(1.0, abs=1e-6)
+
+
+def test_embedding_dim_truncates_and_renormalizes(monkeypatch):
+    """Test that a Matryoshka dim keeps the leading components at unit length."""
+    model = MagicMock()
+    model.get_sentence_embedding_dimension.return_value = 4
+    model.encode.side_effect = lambda texts, **kwargs: np.tile(
+        np.array([0.6, 0.0, 0.8, 0.0], dtype=np.float32), (len(texts), 1)
+    )
+    monkeypatch.setattr(EmbeddingGenerator, "_model_cache", {("fake-model", "cpu", "torch"): model})
+    monkeypatch.setattr(EmbeddingGenerator, "_dim_cache", {})
+
+    generator = EmbeddingGenerator(model_name="fake-model", device="cpu", dim=2)
+    embedding = generator.generate("text")
+    assert embedding.shape == (2,)
+    np.testing.assert_allclose(embedding, [1.0, 0.0], atol=1e-3)
+    assert generator.get_embedding_dimension() == 2
+    generator.cache_size = 0
+    assert generator.generate_batch(["text", "more text"]).flags.c_contiguous
+    assert EmbeddingGenerator(model_name="fake-model", device="cpu", dim=16).get_embedding_dimension() == 4
+    with pytest.raises(ValueError):
+        EmbeddingGenerator(model_name="fake-model", device="cpu", dim=-1)
+
+
+def test_int8_quantization_preserves_similarity():
+    """Test that int8 dot products approximate float32 ones."""
+    from app.rag.quantization import int8_similarity, quantize_int8
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(8, 384)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    quantized, scales = quantize_int8(embeddings)
+    assert quantized.dtype == np.int8
+    approx = int8_similarity(quantized, scales, quantized[0], scales[0])
+    np.testing.assert_allclose(approx, embeddings @ embeddings[0], atol=0.02)
+
+
+def test_generate_document_id():
+    """Test that document IDs are stable and depend on text and metadata."""
+    doc_id = EmbeddingGenerator.generate_document_id("text", {"b": 2, "a": 1})
+    assert len(doc_id) == 16
+    assert doc_id == EmbeddingGenerator.generate_document_id("text", {"a": 1, "b": 2})
+    assert doc_id != EmbeddingGenerator.generate_document_id("text", {"a": 1})
+    assert doc_id != EmbeddingGenerator.generate_document_id("text")
+
+
 @pytest.mark.asyncio
-async def test_vector_store_add_document():
+@requires_chromadb
+async def test_vector_store_add_document(vector_store):
     """Test adding document to vector store."""
-    # This test requires ChromaDB to be running
-    try:
-        vector_store = VectorStore()
-        doc_id = vector_store.add_document("test document", metadata={"test": True})
-        assert doc_id is not None
-    except Exception:
-        pytest.skip("ChromaDB not available")
+    doc_id = vector_store.add_document("test document", metadata={"test": True})
+    assert doc_id is not None
 
 
 @pytest.mark.asyncio
+@requires_chromadb
 async def test_rag_retriever():
     """Test RAG retriever."""
-    retriever = RAGRetriever()
+    from app.rag.retriever import RAGRetriever
+    retriever = RAGRetriever(vector_store=MagicMock())
     processed = retriever.preprocess_query("  test query  ")
     assert processed == "test query"
 
+
+@requires_chromadb
+def test_rerank_results_orders_by_score():
+    """Test re-ranking by score with top-k selection and stable ties."""
+    from app.rag.retriever import RAGRetriever
+    from app.rag.vectorstore import RetrievalResult
+    retriever = RAGRetriever(vector_store=MagicMock())
+    results = [
+        RetrievalResult(id=str(i), document="", metadata={}, distance=None, score=score)
+        for i, score in enumerate([0.2, 0.9, 0.5, 0.9, 0.1])
+    ]
+
+    assert [r.id for r in retriever.rerank_results("q", results)] == ["1", "3", "2", "0", "4"]
+    assert [r.id for r in retriever.rerank_results("q", results, top_k=2)] == ["1", "3"]
+    assert retriever.rerank_results("q", []) == []
+
+
+@requires_chromadb
+def test_retrieve_scores_and_filters():
+    """Test distance-to-score conversion and min_score filtering."""
+    from app.rag.retriever import RAGRetriever
+    from app.rag.vectorstore import RetrievalResult
+    vector_store = MagicMock(distance_metric="l2")
+    vector_store.search_many.return_value = [[
+        RetrievalResult(id="a", document="A", metadata={}, distance=0.2),
+        RetrievalResult(id="b", document="B", metadata={}, distance=1.6),
+        RetrievalResult(id="c", document="C", metadata={}, distance=None),
+    ]]
+    retriever = RAGRetriever(vector_store=vector_store)
+
+    results = retriever.retrieve("query", min_score=0.5)
+    assert [r.id for r in results] == ["a", "c"]
+    assert results[0].score == pytest.approx(0.9)
+    assert results[1].score == 1.0
+
+    vector_store.distance_metric = "ip"
+    results = retriever.retrieve("query", min_score=0.5)
+    assert [r.id for r in results] == ["a", "c"]
+    assert results[0].score == pytest.approx(0.8)
+
+
+@requires_chromadb
+def test_retrieve_with_context_respects_budget():
+    """Test that the context stops before exceeding the character budget."""
+    from app.rag.retriever import RAGRetriever
+    from app.rag.vectorstore import RetrievalResult
+    vector_store = MagicMock(distance_metric="ip")
+    vector_store.search_many.return_value = [[
+        RetrievalResult(id=str(i), document="x" * 10, metadata={}, distance=0.0)
+        for i in range(3)
+    ]]
+    retriever = RAGRetriever(vector_store=vector_store)
+
+    context_data = retriever.retrieve_with_context("query", max_context_length=25)
+    assert context_data["context"] == "x" * 10 + "\n\n" + "x" * 10
+    assert context_data["num_sources"] == 2
+
+
+@requires_chromadb
+def test_search_many_batches_queries(mock_vector_store):
+    """Test that several queries share one embedding pass and one collection query."""
+    mock_vector_store.collection.query.return_value = {
+        "ids": [["a"], ["b", "c"]],
+        "documents": [["A"], ["B", "C"]],
+        "metadatas": [[{}], [{}, {}]],
+        "distances": [[0.1], [0.2, 0.3]],
+    }
+
+    results = mock_vector_store.search_many(["first", "second"], top_k=2)
+    assert [[r.id for r in batch] for batch in results] == [["a"], ["b", "c"]]
+    assert results[1][1].distance == 0.3
+    assert results[1][1].as_dict()["document"] == "C"
+    mock_vector_store.embedding_generator.generate_batch.assert_called_once_with(["first", "second"])
+    mock_vector_store.collection.query.assert_called_once()
+
+
+@requires_chromadb
+def test_search_many_handles_missing_columns(mock_vector_store):
+    """Test result formatting without distances and with an empty response."""
+    mock_vector_store.collection.query.return_value = {
+        "ids": [["a"], []], "documents": [["A"], []], "metadatas": [[{}], []], "distances": None,
+    }
+
+    results = mock_vector_store.search_many(["first", "second"], top_k=1)
+    assert [[(r.id, r.distance) for r in batch] for batch in results] == [[("a", None)], []]
+
+    mock_vector_store.collection.query.return_value = {"ids": [], "documents": [], "metadatas": []}
+    assert mock_vector_store.search_many(["first", "second"], top_k=1) == [[], []]
+
+
+@requires_chromadb
+def test_search_cache_serves_repeat_queries(mock_vector_store):
+    """Test that repeated queries skip the collection and writes invalidate the cache."""
+    from app.cache.semantic_cache import SemanticCache
+    embedder = MagicMock()
+    embedder.generate.return_value = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    embedder.generate_batch.side_effect = lambda texts: np.zeros((len(texts), 3), dtype=np.float32)
+    mock_vector_store.embedding_generator = embedder
+    mock_vector_store.search_cache = SemanticCache(embedding_generator=embedder, threshold=0.95)
+    mock_vector_store.collection.query.return_value = {
+        "ids": [["a"]], "documents": [["A"]], "metadatas": [[{}]], "distances": [[0.1]],
+    }
+
+    first = mock_vector_store.search("what is rag", top_k=1)
+    second = mock_vector_store.search("What is RAG", top_k=1)
+    assert [r.id for r in second] == [r.id for r in first] == ["a"]
+    assert mock_vector_store.collection.query.call_count == 1
+
+    mock_vector_store.search("what is rag", top_k=3)
+    assert mock_vector_store.collection.query.call_count == 2
+
+    mock_vector_store.delete_document("a")
+    mock_vector_store.search("what is rag", top_k=1)
+    assert mock_vector_store.collection.query.call_count == 3
+    embedder.generate.assert_not_called()
+
+
+@requires_chromadb
+def test_search_cache_batches_embeddings_for_many_queries(mock_vector_store):
+    """Test that cached multi-query search embeds once and only queries the misses."""
+    from app.cache.semantic_cache import SemanticCache
+    embedder = MagicMock()
+    embedder.generate_batch.side_effect = lambda texts: np.eye(3, dtype=np.float32)[:len(texts)]
+    mock_vector_store.embedding_generator = embedder
+    mock_vector_store.search_cache = SemanticCache(embedding_generator=embedder, threshold=0.95)
+    mock_vector_store.collection.query.return_value = {
+        "ids": [["a"]], "documents": [["A"]], "metadatas": [[{}]], "distances": [[0.1]],
+    }
+    mock_vector_store.search("alpha", top_k=1)
+
+    mock_vector_store.collection.query.return_value = {
+        "ids": [["b"]], "documents": [["B"]], "metadatas": [[{}]], "distances": [[0.2]],
+    }
+    results = mock_vector_store.search_many(["alpha", "beta"], top_k=1)
+    assert [[r.id for r in batch] for batch in results] == [["a"], ["b"]]
+    assert embedder.generate_batch.call_count == 2
+    assert len(mock_vector_store.collection.query.call_args.kwargs["query_embeddings"]) == 1
+    embedder.generate.assert_not_called()
+
+
+@requires_chromadb
+def test_add_documents_batches_inserts(mock_vector_store, monkeypatch):
+    """Test that large inserts are split into chroma_batch_size chunks."""
+    from app.config import settings
+    monkeypatch.setattr(settings, "chroma_batch_size", 2)
+
+    ids = mock_vector_store.add_documents(["a", "b", "c", "d", "e"], document_ids=["1", "2", "3", "4", "5"])
+    assert ids == ["1", "2", "3", "4", "5"]
+    batches = [call.kwargs["ids"] for call in mock_vector_store.collection.add.call_args_list]
+    assert batches == [["1", "2"], ["3", "4"], ["5"]]
+    assert len(mock_vector_store.collection.add.call_args_list[2].kwargs["embeddings"]) == 1
+
+
+@pytest.mark.asyncio
+@requires_chromadb
+async def test_add_documents_async_overlaps_embedding_and_insert(mock_vector_store, monkeypatch):
+    """Test that a batch is embedded while the previous batch is being inserted."""
+    import threading
+    from app.config import settings
+    monkeypatch.setattr(settings, "chroma_batch_size", 2)
+    inserting = threading.Event()
+
+    def generate_batch(texts):
+        if texts[0] != "a":
+            # Only completes if the first batch's insert runs concurrently
+            assert inserting.wait(timeout=5)
+        return np.zeros((len(texts), 3), dtype=np.float32)
+
+    mock_vector_store.embedding_generator.generate_batch.side_effect = generate_batch
+    mock_vector_store.collection.add.side_effect = lambda **kwargs: inserting.set()
+
+    ids = await mock_vector_store.add_documents_async(["a", "b", "c"], document_ids=["1", "2", "3"])
+    assert ids == ["1", "2", "3"]
+    batches = [call.kwargs["ids"] for call in mock_vector_store.collection.add.call_args_list]
+    assert batches == [["1", "2"], ["3"]]
+
+
+@requires_chromadb
+def test_add_documents_leaves_caller_metadata_untouched(mock_vector_store):
+    """Test that text_length is added to copies of the caller's metadata."""
+    metadatas = [{"source": "a"}, None]
+
+    mock_vector_store.add_documents(["one", "three"], document_ids=["1", "2"], metadatas=metadatas)
+    assert metadatas == [{"source": "a"}, None]
+    assert mock_vector_store.collection.add.call_args.kwargs["metadatas"] == [
+        {"source": "a", "text_length": 3}, {"text_length": 5}
+    ]
+
+
+@requires_chromadb
+def test_preprocess_query_collapses_whitespace():
+    """Test that query whitespace is collapsed and trimmed."""
+    from app.rag.retriever import RAGRetriever
+    retriever = RAGRetriever(vector_store=MagicMock())
+    assert retriever.preprocess_query("  what\tis \n\n RAG?  ") == "what is RAG?"
+    assert retriever.preprocess_query("a\x00b ") == "ab"
+    assert len(retriever.preprocess_query("x" * 2000)) == 1000
+
+
+@requires_chromadb
+def test_format_context_for_llm():
+    """Test context formatting with and without source attribution."""
+    from app.rag.retriever import RAGRetriever
+    retriever = RAGRetriever(vector_store=MagicMock())
+    context_data = {
+        "context": "Doc text",
+        "sources": [{"id": "a", "metadata": {"title": "Guide"}}, {"id": "b", "metadata": {}}],
+    }
+
+    assert retriever.format_context_for_llm(context_data) == (
+        "Relevant Context:\n\nDoc text\n\nSources:\n1. Document ID: a - Guide\n2. Document ID: b\n"
+    )
+    assert retriever.format_context_for_llm(context_data, include_sources=False) == "Relevant Context:\n\nDoc text"
+    assert retriever.format_context_for_llm({"context": ""}) == "No relevant context found."
+
+
+def test_chunk_text_offsets():
+    """Test chunk boundaries, overlap, and the overlap >= chunk_size guard."""
+    from app.utils.helpers import chunk_text
+    assert chunk_text("abc", 5) == ["abc"]
+    assert chunk_text("abcdefghij", 5, 2) == ["abcde", "defgh", "ghij", "j"]
+    assert chunk_text("abcdef", 3) == ["abc", "def"]
+    assert chunk_text("abcd", 2, 5) == ["ab", "bc", "cd", "d"]
+
+
+def test_chunk_text_iter_matches_chunk_text():
+    """Test that the lazy chunker yields the same chunks as chunk_text."""
+    from app.utils.helpers import chunk_offsets, chunk_text, chunk_text_iter
+    text = "abcdefghijklmnopqrstuvwxyz"
+    for size, overlap in ((5, 2), (30, 0), (4, 0)):
+        assert list(chunk_text_iter(text, size, overlap)) == chunk_text(text, size, overlap)
+        assert len(chunk_offsets(len(text), size, overlap)) == len(chunk_text(text, size, overlap))
+
+
+@requires_chromadb
+def test_add_document_chunked_inserts_in_batches(mock_vector_store, monkeypatch):
+    """Test that chunked ingest embeds and inserts one batch of chunks at a time."""
+    from app.config import settings
+    monkeypatch.setattr(settings, "chroma_batch_size", 2)
+
+    ids = mock_vector_store.add_document_chunked("abcdefghij", document_id="doc", chunk_size=2, chunk_overlap=0)
+    assert ids == [f"doc_chunk_{i}" for i in range(5)]
+    batch_sizes = [len(call.args[0]) for call in mock_vector_store.embedding_generator.generate_batch.call_args_list]
+    assert batch_sizes == [2, 2, 1]
+    last_metadata = mock_vector_store.collection.add.call_args.kwargs["metadatas"][-1]
+    assert last_metadata == {"chunk_index": 4, "total_chunks": 5, "base_document_id": "doc", "text_length": 2}
+
+
+@requires_chromadb
+def test_vector_store_opens_collection_in_one_call(monkeypatch):
+    """Test that the collection is fetched or created with a single client call."""
+    import chromadb
+    from app.rag.vectorstore import VectorStore
+    client = MagicMock()
+    client.get_or_create_collection.return_value.metadata = {"hnsw:space": "ip"}
+    monkeypatch.setattr(chromadb, "HttpClient", MagicMock(return_value=client))
+
+    vector_store = VectorStore(collection_name="docs", embedding_generator=MagicMock(dim=256))
+    client.get_or_create_collection.assert_called_once()
+    client.get_collection.assert_not_called()
+    assert vector_store.distance_metric == "ip"
+    assert client.get_or_create_collection.call_args.kwargs["metadata"]["embedding_dim"] == 256
+
+
+@requires_chromadb
+def test_collection_stats_reuse_count_until_write(mock_vector_store):
+    """Test that stats polling reuses the collection count until the store changes."""
+    mock_vector_store.embedding_generator.get_embedding_dimension.return_value = 384
+    mock_vector_store.collection.count.return_value = 7
+
+    assert mock_vector_store.get_collection_stats()["document_count"] == 7
+    assert mock_vector_store.get_collection_stats()["embedding_dimension"] == 384
+    assert mock_vector_store.collection.count.call_count == 1
+
+    mock_vector_store.delete_document("a")
+    mock_vector_store.get_collection_stats()
+    assert mock_vector_store.collection.count.call_count == 2
+
+
+@requires_chromadb
+def test_add_document_chunked_uses_given_id_without_hashing(mock_vector_store):
+    """Test that a caller-supplied document ID skips hashing the full text."""
+    ids = mock_vector_store.add_document_chunked("x" * 25, document_id="doc", chunk_size=10, chunk_overlap=0)
+    assert ids == ["doc_chunk_0", "doc_chunk_1", "doc_chunk_2"]
+    mock_vector_store.embedding_generator.generate_document_id.assert_not_called()
+
+
+@requires_chromadb
+def test_build_where_translates_filters():
+    """Test translation of metadata filters into Chroma where clauses."""
+    from app.rag.vectorstore import _build_where
+    assert _build_where(None) is None
+    assert _build_where({}) is None
+    assert _build_where({"source": "faq"}) == {"source": {"$eq": "faq"}}
+    assert _build_where({"source": ["faq", "docs"], "chunk_index": {"$gt": 2}}) == {
+        "$and": [{"source": {"$in": ["faq", "docs"]}}, {"chunk_index": {"$gt": 2}}]
+    }
+    or_clause = {"$or": [{"a": {"$eq": 1}}, {"b": {"$eq": 2}}]}
+    assert _build_where(or_clause) == or_clause